@@ -1,19 +1,39 @@
 import os
+import sys
 import json
 import tarfile
 import xml.etree.ElementTree as ET
 import datetime
 import shutil
 import calendar
+import hashlib
 from io import BytesIO
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.telemetry import configure, get_logger, metrics
+
+# Ассемблер и интерпретатор УВМ для команды run
+VM_DIR = os.path.join(ROOT_DIR, "4 project")
+# Транспилятор TOML для команды transpile (импортируется как пакет src)
+TRANSPILER_DIR = os.path.join(ROOT_DIR, "3 project")
+
+log = get_logger("shell")
+
 class ShellEmulator:
     def __init__(self, config_file):
         self.load_config(config_file)
         self.fs_structure = {}  # Хранит файлы и каталоги виртуальной файловой системы
         self.current_directory = ""  # Текущая директория внутри виртуальной файловой системы
         self.log_actions = []
-        self.load_virtual_fs()  # Загружаем виртуальную файловую систему при инициализации
+        # Путь файла образа -> (SHA-256 содержимого, интерпретатор с загруженной программой)
+        self.vm_programs = {}
+        # Путь TOML-файла образа -> (SHA-256 содержимого, результат трансляции)
+        self.transpiled = {}
+        with metrics.timer("shell.load_fs"):
+            self.load_virtual_fs()  # Загружаем виртуальную файловую систему при инициализации
 
     def load_config(self, config_file):
         with open(config_file, 'r') as f:
@@ -25,7 +45,7 @@ class ShellEmulator:
 
     def load_virtual_fs(self):
         if not os.path.exists(self.fs_archive):
-            print(f"Archive {self.fs_archive} not found.")
+            log.error("Archive %s not found.", self.fs_archive)
             exit(1)
 
         # Загружаем файловую систему в память, используя tarfile
@@ -34,7 +54,11 @@ class ShellEmulator:
                 if member.isdir():
                     self.fs_structure[member.name] = set()
                 elif member.isfile():
-                    file_content = tar.extractfile(member).read().decode()
+                    file_content = tar.extractfile(member).read()
+                    try:
+                        file_content = file_content.decode()
+                    except UnicodeDecodeError:
+                        pass  # Двоичные файлы (например, программы УВМ .bin) хранятся как bytes
                     self.fs_structure[member.name] = file_content
         
         self.fs_structure[''] = set()
@@ -54,6 +78,7 @@ class ShellEmulator:
         
     def log_action(self, action):
         self.log_actions.append((datetime.datetime.now(), action))
+        log.debug("Команда: %s", action)
 
     def execute_command(self, command):
         parts = command.split()
@@ -62,6 +87,7 @@ class ShellEmulator:
 
         cmd = parts[0]
         self.log_action(command)  # Логируем команду
+        metrics.count("shell.commands")
 
         if cmd == "ls":
             return self.cmd_ls()
@@ -78,6 +104,14 @@ class ShellEmulator:
             if len(parts) < 3:
                 return "cp requires source and destination arguments"
             return self.cmd_cp(parts[1], parts[2])
+        elif cmd == "run":
+            if len(parts) not in (2, 4):
+                return "run requires a file and an optional memory range: run FILE [START END]"
+            return self.cmd_run(parts[1], *parts[2:])
+        elif cmd == "transpile":
+            if len(parts) not in (2, 3):
+                return "transpile requires a file and an optional destination: transpile FILE [DEST]"
+            return self.cmd_transpile(parts[1], *parts[2:])
         else:
             return "Unknown command"
 
@@ -125,6 +159,97 @@ class ShellEmulator:
         else:
             return f"File {src} not found"
 
+    def cmd_run(self, filename, start=None, end=None):
+        file_path = os.path.join(self.current_directory, filename)
+        content = self.fs_structure.get(file_path)
+        if content is None or type(content) == set:
+            return f"File {filename} not found"
+        if not file_path.endswith((".asm", ".bin")):
+            return f"File {filename} is not a VM program (.asm or .bin)"
+
+        try:
+            interpreter = self.load_vm_program(file_path, content)
+            with metrics.timer("shell.run"):
+                interpreter.reset()
+                interpreter.run()
+            if start is None:
+                return f"Executed {len(interpreter.code)} commands"
+            start, end = int(start), int(end)
+            interpreter.check_address(start, "чтении результата")
+            interpreter.check_address(end, "чтении результата")
+        except ValueError as e:
+            return f"Error: {e}"
+        values = interpreter.memory[start:end + 1]
+        return "\n".join(["Address,Value"] + [f"{addr},{value}" for addr, value in zip(range(start, end + 1), values)])
+
+    def load_vm_program(self, file_path, content):
+        """Интерпретатор с программой из файла образа: .asm собирается в памяти, .bin загружается как есть.
+
+        Результат кэшируется по пути и хэшу содержимого, поэтому повторный run
+        не собирает и не декодирует программу заново, а выполняется
+        скомпилированными блоками JIT.
+        """
+        data = content.encode() if type(content) == str else content
+        digest = hashlib.sha256(data).digest()
+        cached = self.vm_programs.get(file_path)
+        if cached is not None and cached[0] == digest:
+            metrics.count("shell.run_cache_hits")
+            return cached[1]
+
+        if VM_DIR not in sys.path:
+            sys.path.insert(0, VM_DIR)
+        from assembler import Assembler
+        from interpreter import Interpreter
+
+        program = Assembler(None, None, None).assemble_source(data.decode()) if file_path.endswith(".asm") else data
+        interpreter = Interpreter(None, None, None, jit=True)
+        interpreter.load_bytes(program)
+        self.vm_programs[file_path] = (digest, interpreter)
+        return interpreter
+
+    def cmd_transpile(self, filename, dest=None):
+        file_path = os.path.join(self.current_directory, filename)
+        content = self.fs_structure.get(file_path)
+        if content is None or type(content) == set:
+            return f"File {filename} not found"
+
+        try:
+            result = self.transpile_member(file_path, content)
+        except ValueError as e:
+            return f"Error: {e}"
+        if dest is None:
+            return result
+
+        # Результат записывается в образ, как у cp: на диск ничего не извлекается
+        dest_path = os.path.join(self.current_directory, dest)
+        if type(self.fs_structure.get(dest_path)) == set:
+            return f"{dest} is a directory"
+        if type(self.fs_structure.get(os.path.dirname(dest_path))) != set:
+            return f"Directory {os.path.dirname(dest) or dest} not found"
+        self.fs_structure[os.path.dirname(dest_path)].add(os.path.basename(dest_path))
+        self.fs_structure[dest_path] = result
+        return f"Transpiled {filename} to {dest}"
+
+    def transpile_member(self, file_path, content):
+        """Транслирует TOML-файл образа в памяти; результат кэшируется по пути и хэшу содержимого."""
+        data = content.encode() if type(content) == str else content
+        digest = hashlib.sha256(data).digest()
+        cached = self.transpiled.get(file_path)
+        if cached is not None and cached[0] == digest:
+            metrics.count("shell.transpile_cache_hits")
+            return cached[1]
+
+        if TRANSPILER_DIR not in sys.path:
+            sys.path.insert(0, TRANSPILER_DIR)
+        from src.transpiler import ConfigTranspiler
+
+        # Таблица символов накапливается при трансляции, поэтому транспилятор каждый раз новый
+        transpiler = ConfigTranspiler(None, None, verbose=False)
+        with metrics.timer("shell.transpile"):
+            result = transpiler.convert(transpiler.load_toml(data.decode()))
+        self.transpiled[file_path] = (digest, result)
+        return result
+
     def save_log(self):
         root = ET.Element("log")
         for timestamp, action in self.log_actions:
@@ -135,6 +260,7 @@ class ShellEmulator:
         tree.write(self.log_file_path)
 
 if __name__ == "__main__":
+    configure()
     emulator = ShellEmulator('config.json')
     while True:
         command = input(f"{emulator.current_directory}> ")
@@ -55,5 +55,42 @@ class TestShellEmulator(unittest.TestCase):
         result = self.emulator.execute_command('cp file1.txt file2.txt')
         self.assertEqual(result, "Copied from file1.txt to file2.txt")
 
+    def add_file(self, name, content):
+        self.emulator.fs_structure[name] = content
+        self.emulator.fs_structure[''].add(name)
+
+    def test_run_asm(self):
+        self.add_file('prog.asm', "LOAD 2 5 10\nLOAD 2 3 11\nMIN 6 10 11 12\n")
+        result = self.emulator.execute_command('run prog.asm 10 12')
+        self.assertEqual(result, "Address,Value\n10,5\n11,3\n12,3")
+        # Повторный запуск берет программу из кэша и начинает с чистой памяти
+        self.assertEqual(self.emulator.execute_command('run prog.asm 10 12'), result)
+        self.assertEqual(len(self.emulator.vm_programs), 1)
+
+    def test_run_bin_and_errors(self):
+        self.add_file('prog.bin', bytes.fromhex("a200a0000000"))  # LOAD 2 20 10
+        self.assertTrue(self.emulator.execute_command('run prog.bin').startswith("Executed"))
+        self.add_file('bad.asm', "JUMP 1\n")
+        self.assertTrue(self.emulator.execute_command('run bad.asm').startswith("Error"))
+        self.assertEqual(self.emulator.execute_command('run file1.txt'),
+                         "File file1.txt is not a VM program (.asm or .bin)")
+
+    def test_transpile(self):
+        self.add_file('app.toml', 'port = 8080\nname = "web"\n')
+        result = self.emulator.execute_command('transpile app.toml')
+        self.assertIn("8080", result)
+        self.assertEqual(self.emulator.execute_command('transpile app.toml app.conf'), "Transpiled app.toml to app.conf")
+        self.assertEqual(self.emulator.fs_structure['app.conf'], result)
+        self.assertIn('app.conf', self.emulator.fs_structure[''])
+        # Измененный файл транслируется заново, а не берется из кэша
+        self.emulator.fs_structure['app.toml'] = 'port = 9090\n'
+        self.assertIn("9090", self.emulator.execute_command('transpile app.toml'))
+        self.assertEqual(self.emulator.execute_command('transpile app.toml nodir/out.conf'),
+                         "Directory nodir not found")
+        self.assertEqual(self.emulator.execute_command('transpile app.toml app.toml/out.conf'),
+                         "Directory app.toml not found")
+        self.add_file('bad.toml', 'port = = 1\n')
+        self.assertTrue(self.emulator.execute_command('transpile bad.toml').startswith("Error"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import timeit
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from src.backends import available_backends, get_backend
+
+TABLE_HEADER = re.compile(r"^\[(\[?)([_a-zA-Z][_a-zA-Z0-9]*)")
+
+
+def scale_document(text, copies):
+    """Размножает все таблицы документа, добавляя к корневому ключу суффикс _N."""
+    parts = []
+    for i in range(copies):
+        for line in text.splitlines():
+            parts.append(TABLE_HEADER.sub(rf"[\g<1>\g<2>_{i}", line))
+        parts.append("")
+    return "\n".join(parts)
+
+
+def load_examples(pattern, copies):
+    """Читает примеры и возвращает их увеличенные версии."""
+    documents = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r") as f:
+            documents[os.path.basename(path)] = scale_document(f.read(), copies)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение бэкендов разбора TOML")
+    parser.add_argument("--examples", default=os.path.join(PROJECT_DIR, "examples", "*.toml"),
+                        help="Маска входных TOML-файлов")
+    parser.add_argument("--scale", type=int, default=1000, help="Во сколько раз увеличить каждый пример")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов замера")
+    args = parser.parse_args()
+
+    documents = load_examples(args.examples, args.scale)
+    backends = [get_backend(name) for name in available_backends()]
+
+    print(f"{'файл':<16}{'размер, КБ':>12}" + "".join(f"{b.name:>12}" for b in backends))
+    for name, text in documents.items():
+        row = f"{name:<16}{len(text) / 1024:>12.1f}"
+        for backend in backends:
+            # Берем лучший из повторов, чтобы уменьшить влияние шума
+            best = min(timeit.repeat(lambda: backend.loads(text), number=1, repeat=args.repeat))
+            row += f"{best * 1000:>10.1f}мс"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
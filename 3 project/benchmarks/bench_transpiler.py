@@ -0,0 +1,125 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Корень репозитория - для общей обвязки common.benchmark
+sys.path[:0] = [PROJECT_DIR, os.path.dirname(PROJECT_DIR)]
+
+from benchmarks.generator import GENERATORS, generate
+from common.benchmark import add_arguments, check_baseline, growth, peak_memory
+from src.expressions import compile_expression
+from src.symbols import SymbolTable
+from src.transpiler import ConfigTranspiler
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+STAGES = ("parse", "extract_constants", "resolve_all_constants", "process_data")
+# Этапы быстрее этого времени (с) не сравниваются: их замер - в основном шум таймера и планировщика
+MIN_STAGE_TIME = 0.02
+
+
+def run_stages(text, backend=None):
+    """Выполняет этапы трансляции по отдельности и возвращает время каждого."""
+    # Кэш compile_expression общий для всех прогонов: без очистки малый документ
+    # извлекается с теплым кэшем, а большой его вытесняет, и рост времени завышается
+    compile_expression.cache_clear()
+    transpiler = ConfigTranspiler(None, None, backend, verbose=False)
+    timings = {}
+
+    started = time.perf_counter()
+    data = transpiler.load_toml(text)
+    timings["parse"] = time.perf_counter() - started
+
+    transpiler.symbols = SymbolTable()
+    started = time.perf_counter()
+    transpiler.extract_constants(data)
+    timings["extract_constants"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    transpiler.resolve_all_constants()
+    timings["resolve_all_constants"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    transpiler.process_data(data)
+    timings["process_data"] = time.perf_counter() - started
+    return timings
+
+
+def measure(text, backend=None, repeat=3):
+    """Лучшее время каждого этапа из repeat прогонов и пик памяти отдельным прогоном."""
+    best = {stage: math.inf for stage in STAGES}
+    for _ in range(repeat):
+        for stage, elapsed in run_stages(text, backend).items():
+            best[stage] = min(best[stage], elapsed)
+    return {"time": best, "peak_memory": peak_memory(lambda: run_stages(text, backend))}
+
+
+def run_suite(sizes, backend=None, repeat=3):
+    results = {}
+    small, large = sizes
+    for kind in GENERATORS:
+        small_result = measure(generate(kind, small), backend, repeat)
+        large_result = measure(generate(kind, large), backend, repeat)
+        results[kind] = {
+            "size": large,
+            "time": large_result["time"],
+            "peak_memory": large_result["peak_memory"],
+            "growth": {stage: growth(small_result["time"][stage], large_result["time"][stage], large / small)
+                       for stage in STAGES},
+        }
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance, max_growth):
+    """Возвращает список регрессий относительно сохраненных результатов."""
+    regressions = []
+    for kind, result in results.items():
+        for stage in STAGES:
+            if result["time"][stage] >= MIN_STAGE_TIME and result["growth"][stage] > max_growth:
+                regressions.append(f"{kind}/{stage}: рост времени n^{result['growth'][stage]:.2f}")
+
+        reference = baseline.get(kind)
+        if reference is None or reference["size"] != result["size"]:
+            continue
+        for stage in STAGES:
+            if reference["time"][stage] < MIN_STAGE_TIME:
+                continue
+            limit = reference["time"][stage] * (1 + tolerance)
+            if result["time"][stage] > limit:
+                regressions.append(f"{kind}/{stage}: {result['time'][stage] * 1000:.1f}мс, "
+                                   f"в базовой версии {reference['time'][stage] * 1000:.1f}мс")
+        if result["peak_memory"] > reference["peak_memory"] * (1 + tolerance):
+            regressions.append(f"{kind}: пик памяти {result['peak_memory'] // 1024}КБ, "
+                               f"в базовой версии {reference['peak_memory'] // 1024}КБ")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'профиль':<18}" + "".join(f"{stage:>24}" for stage in STAGES) + f"{'память, КБ':>12}")
+    for kind, result in results.items():
+        row = f"{kind:<18}"
+        for stage in STAGES:
+            row += f"{result['time'][stage] * 1000:>13.1f}мс (n^{result['growth'][stage]:.1f})"
+        print(row + f"{result['peak_memory'] // 1024:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов транспилятора на синтетических документах")
+    parser.add_argument("--sizes", type=int, nargs=2, default=[2000, 8000],
+                        help="Два размера документа для оценки роста времени")
+    add_arguments(parser, BASELINE_PATH, 0.5, "Допустимое замедление относительно базовой версии (0.5 = 50%%)")
+    parser.add_argument("-b", "--backend", default="auto", help="Парсер TOML")
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="Максимальный допустимый показатель роста времени")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.backend, args.repeat)
+    print_results(results)
+    check_baseline(args, results,
+                   lambda results, baseline: compare_with_baseline(results, baseline, args.tolerance, args.max_growth))
+
+
+if __name__ == "__main__":
+    main()
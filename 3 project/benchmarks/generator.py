@@ -0,0 +1,72 @@
+"""Генератор синтетических TOML-документов для бенчмарков транспилятора."""
+
+
+def deep_nesting(size, depth=40):
+    """Цепочки вложенных таблиц глубины depth; в каждой таблице значение и ссылка на родителя."""
+    lines = []
+    for branch in range(max(1, size // depth)):
+        path = f"branch{branch}"
+        lines += [f"[{path}]", "level = 0", ""]
+        for level in range(1, depth):
+            path = f"{path}.level{level}"
+            lines += [f"[{path}]", f"level = {level}", 'parent = "#(level)"', f'name = "node{level}"', ""]
+    return "\n".join(lines)
+
+
+def wide_table(size):
+    """Одна таблица с size ключами: числа, строки и ссылки на соседние ключи."""
+    lines = ["[wide]"]
+    for i in range(size):
+        if i % 3 == 0:
+            lines.append(f"key{i} = {i}")
+        elif i % 3 == 1:
+            lines.append(f'key{i} = "#(key{i - 1})"')
+        else:
+            lines.append(f'key{i} = "value{i}"')
+    return "\n".join(lines) + "\n"
+
+
+def constant_chain(size):
+    """Длинная цепочка def-констант, каждая вычисляется из предыдущей."""
+    lines = ["[constants]", 'c0 = "def C0 := 1;"']
+    for i in range(1, size):
+        lines.append(f'c{i} = "def C{i} := C{i - 1} + 1;"')
+    lines += ["", "[usage]", f'last = "#(C{size - 1})"', f'sum = "#(C0 + C{size // 2})"']
+    return "\n".join(lines) + "\n"
+
+
+def large_arrays(size, length=200):
+    """Таблицы с большими массивами чисел и массивами ссылок."""
+    lines = []
+    for table in range(max(1, size // length)):
+        numbers = ", ".join(str(i) for i in range(length))
+        refs = ", ".join(f'"#(base + {i})"' for i in range(0, length, 10))
+        lines += [f"[arrays{table}]", f"base = {table}", f"numbers = [{numbers}]", f"refs = [{refs}]", ""]
+    return "\n".join(lines)
+
+
+def identical_names(size, tables=100):
+    """Много таблиц с одинаковыми именами ключей: проверка областей видимости."""
+    lines = []
+    per_table = max(1, size // tables)
+    for table in range(tables):
+        lines.append(f"[table{table}]")
+        for i in range(per_table):
+            lines.append(f"port{i} = {table * per_table + i}")
+            lines.append(f'ref{i} = "#(port{i})"')
+        lines.append("")
+    return "\n".join(lines)
+
+
+GENERATORS = {
+    "deep_nesting": deep_nesting,
+    "wide_table": wide_table,
+    "constant_chain": constant_chain,
+    "large_arrays": large_arrays,
+    "identical_names": identical_names,
+}
+
+
+def generate(kind, size):
+    """Возвращает TOML-документ заданного вида примерно из size значений."""
+    return GENERATORS[kind](size)
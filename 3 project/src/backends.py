@@ -0,0 +1,94 @@
+import importlib
+
+# Модули парсеров необязательны: исключения берутся только из установленных
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+try:
+    import toml
+except ImportError:
+    toml = None
+try:
+    import rtoml
+except ImportError:
+    rtoml = None
+
+
+class ParserBackend:
+    """Базовый класс бэкенда разбора TOML."""
+
+    name = None
+    module_name = None
+    # Исключения, которые бэкенд выбрасывает при синтаксической ошибке
+    errors = ()
+
+    def __init__(self):
+        self.module = importlib.import_module(self.module_name)
+
+    @classmethod
+    def is_available(cls):
+        """Проверяет, установлен ли модуль бэкенда."""
+        try:
+            importlib.import_module(cls.module_name)
+        except ImportError:
+            return False
+        return True
+
+    def loads(self, text):
+        """Разбирает строку TOML и возвращает словарь."""
+        return self.module.loads(text)
+
+
+class TomlBackend(ParserBackend):
+    """Чистый Python-пакет toml (исходная реализация)."""
+
+    name = "toml"
+    module_name = "toml"
+    errors = (toml.TomlDecodeError,) if toml is not None else ()
+
+
+class TomllibBackend(ParserBackend):
+    """Стандартная библиотека tomllib (Python 3.11+)."""
+
+    name = "tomllib"
+    module_name = "tomllib"
+    errors = (tomllib.TOMLDecodeError,) if tomllib is not None else ()
+
+
+class RtomlBackend(ParserBackend):
+    """Компилируемый парсер rtoml (Rust), если установлен."""
+
+    name = "rtoml"
+    module_name = "rtoml"
+    errors = (rtoml.TomlParsingError,) if rtoml is not None else ()
+
+
+# Порядок важен: при автоопределении выбирается первый доступный бэкенд
+BACKENDS = {
+    RtomlBackend.name: RtomlBackend,
+    TomllibBackend.name: TomllibBackend,
+    TomlBackend.name: TomlBackend,
+}
+
+
+def available_backends():
+    """Возвращает имена установленных бэкендов в порядке предпочтения."""
+    return [name for name, cls in BACKENDS.items() if cls.is_available()]
+
+
+def get_backend(name=None):
+    """Возвращает экземпляр бэкенда по имени или самый быстрый из доступных."""
+    if name is None or name == "auto":
+        available = available_backends()
+        if not available:
+            raise ValueError("Не найден ни один парсер TOML: установите toml или используйте Python 3.11+")
+        name = available[0]
+
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд TOML: {name}")
+
+    backend_cls = BACKENDS[name]
+    if not backend_cls.is_available():
+        raise ValueError(f"Бэкенд TOML {name} не установлен")
+    return backend_cls()
@@ -0,0 +1,187 @@
+import glob
+import json
+import os
+import time
+
+try:
+    from .backends import get_backend
+    from .cache import BuildCache, file_hash
+    from .transpiler import ConfigTranspiler
+except ImportError:
+    from backends import get_backend
+    from cache import BuildCache, file_hash
+    from transpiler import ConfigTranspiler
+
+from common.pool import run_jobs
+
+OUTPUT_EXTENSION = ".txt"
+GLOB_CHARS = "*?["
+
+# Состояние процесса-обработчика: заполняется один раз в _init_worker
+_worker_state = {}
+
+
+def is_batch_input(inputs):
+    """Проверяет, нужно ли обрабатывать входные пути в пакетном режиме."""
+    return len(inputs) > 1 or any(os.path.isdir(path) or any(c in path for c in GLOB_CHARS) for path in inputs)
+
+
+def _glob_base(pattern):
+    """Возвращает часть маски до первого специального символа."""
+    parts = []
+    for part in pattern.replace("\\", "/").split("/"):
+        if any(c in part for c in GLOB_CHARS):
+            break
+        parts.append(part)
+    return "/".join(parts) or "."
+
+
+def collect_inputs(patterns):
+    """Собирает пары (входной файл, относительный путь) из каталогов, масок и файлов."""
+    seen = set()
+    inputs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            base = pattern
+            paths = glob.glob(os.path.join(pattern, "**", "*.toml"), recursive=True)
+        elif any(c in pattern for c in GLOB_CHARS):
+            base = _glob_base(pattern)
+            paths = glob.glob(pattern, recursive=True)
+        else:
+            base = os.path.dirname(pattern)
+            paths = [pattern]
+
+        for path in sorted(paths):
+            if not os.path.isfile(path):
+                continue
+            key = os.path.abspath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            inputs.append((path, os.path.relpath(path, base or ".")))
+    return inputs
+
+
+def output_path(output_dir, relative_path):
+    """Строит путь результата, повторяющий структуру входного дерева."""
+    return os.path.join(output_dir, os.path.splitext(relative_path)[0] + OUTPUT_EXTENSION)
+
+
+def load_shared_constants(paths, backend=None):
+    """Разбирает библиотеки констант один раз и возвращает общий словарь разрешенных значений."""
+    backend = get_backend(backend)
+    shared = {}
+    for path in paths:
+        transpiler = ConfigTranspiler(path, None, backend, shared_constants=dict(shared), verbose=False)
+        with open(path, "r") as f:
+            data = transpiler.load_toml(f.read())
+        transpiler.extract_constants(data)
+        transpiler.resolve_all_constants()
+        shared.update(transpiler.export_constants())
+    return shared
+
+
+def _init_worker(backend_name, shared_constants):
+    _worker_state["backend"] = get_backend(backend_name)
+    _worker_state["shared_constants"] = shared_constants
+
+
+def _transpile_one(job):
+    """Транслирует один файл; ошибки возвращаются, а не выбрасываются."""
+    input_file, output_file, input_hash = job
+    started = time.perf_counter()
+    deps = {}
+    try:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        transpiler = ConfigTranspiler(input_file, output_file, _worker_state["backend"],
+                                      shared_constants=_worker_state["shared_constants"], verbose=False)
+        transpiler.transpile()
+        deps = transpiler.used_shared
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return input_file, output_file, input_hash, deps, error, time.perf_counter() - started
+
+
+class BatchReport:
+    """Итоговый отчет пакетной трансляции."""
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.skipped = []
+        self.elapsed = 0.0
+
+    def add(self, input_file, output_file, error, elapsed):
+        if error is None:
+            self.succeeded.append({"input": input_file, "output": output_file, "time": elapsed})
+        else:
+            self.failed.append({"input": input_file, "error": error})
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def summary(self):
+        lines = [
+            f"Обработано файлов: {len(self.succeeded) + len(self.failed) + len(self.skipped)}",
+            f"Успешно: {len(self.succeeded)}",
+            f"Без изменений (из кэша): {len(self.skipped)}",
+            f"С ошибками: {len(self.failed)}",
+            f"Время: {self.elapsed:.2f} с",
+        ]
+        for entry in self.failed:
+            lines.append(f"  {entry['input']}: {entry['error']}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"succeeded": self.succeeded, "failed": self.failed, "skipped": self.skipped,
+                       "elapsed": self.elapsed},
+                      f, ensure_ascii=False, indent=2)
+
+
+def transpile_batch(patterns, output_dir, jobs=None, shared_paths=(), backend=None, cache_path=None):
+    """Транслирует все найденные TOML-файлы в пуле процессов и возвращает отчет."""
+    started = time.perf_counter()
+    backend_name = get_backend(backend).name
+    shared_constants = load_shared_constants(shared_paths, backend_name)
+    cache = BuildCache(cache_path) if cache_path else None
+
+    report = BatchReport()
+    by_output = {}
+    for path, rel in collect_inputs(patterns):
+        output_file = output_path(output_dir, rel)
+        by_output.setdefault(os.path.normcase(os.path.abspath(output_file)), []).append((path, output_file))
+
+    tasks = []
+    for entries in by_output.values():
+        if len(entries) > 1:
+            # Такие файлы перезаписывали бы результат друг друга, поэтому ни один не транслируется
+            sources = ", ".join(path for path, _ in entries)
+            for path, output_file in entries:
+                report.add(path, output_file, f"Несколько входных файлов дают один результат {output_file}: {sources}",
+                           0.0)
+            continue
+        path, output_file = entries[0]
+        input_hash = None
+        if cache is not None:
+            input_hash = file_hash(path)
+            if cache.is_fresh(path, output_file, input_hash, shared_constants):
+                report.skipped.append(path)
+                continue
+        tasks.append((path, output_file, input_hash))
+
+    def collect(result):
+        input_file, output_file, input_hash, deps, error, elapsed = result
+        report.add(input_file, output_file, error, elapsed)
+        if cache is not None and error is None:
+            cache.record(input_file, output_file, input_hash, deps)
+
+    for result in run_jobs(_transpile_one, tasks, jobs, _init_worker, (backend_name, shared_constants)):
+        collect(result)
+
+    if cache is not None:
+        cache.save()
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+
+try:
+    from .transpiler import TRANSPILER_VERSION
+except ImportError:
+    from transpiler import TRANSPILER_VERSION
+
+
+def file_hash(path):
+    """Возвращает SHA-256 содержимого файла."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class BuildCache:
+    """Кэш инкрементальной сборки: манифест в JSON с хешами входов и зависимостями.
+
+    Запись считается актуальной, если совпадают хеш входного файла, версия
+    транспилятора и путь результата, результат существует, а все использованные
+    файлом общие константы имеют прежние значения.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            # Манифест другой версии транспилятора целиком недействителен
+            if manifest.get("version") == TRANSPILER_VERSION:
+                self.entries = manifest.get("entries", {})
+
+    @staticmethod
+    def key(input_file):
+        return os.path.abspath(input_file)
+
+    def is_fresh(self, input_file, output_file, input_hash, shared_constants):
+        """Проверяет, можно ли пропустить трансляцию файла."""
+        entry = self.entries.get(self.key(input_file))
+        if entry is None:
+            return False
+        if entry["input_hash"] != input_hash or entry["output"] != os.path.abspath(output_file):
+            return False
+        if not os.path.exists(output_file):
+            return False
+        # Файл пересобирается, если изменилось определение хотя бы одной использованной общей константы
+        return all(shared_constants.get(name) == value for name, value in entry["deps"].items())
+
+    def record(self, input_file, output_file, input_hash, deps):
+        """Сохраняет сведения об успешной трансляции."""
+        self.entries[self.key(input_file)] = {
+            "input_hash": input_hash,
+            "output": os.path.abspath(output_file),
+            "deps": dict(deps),
+        }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"version": TRANSPILER_VERSION, "entries": self.entries}, f, ensure_ascii=False, indent=1)
+        self.dirty = False
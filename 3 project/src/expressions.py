@@ -0,0 +1,222 @@
+import operator
+from functools import lru_cache
+
+
+class ExpressionError(ValueError):
+    """Синтаксическая ошибка или ошибка вычисления константного выражения."""
+
+
+def _add(a, b):
+    # Строки склеиваются только со строками, числа складываются только с числами
+    if isinstance(a, str) != isinstance(b, str):
+        raise TypeError("нельзя складывать строку и число")
+    return a + b
+
+
+def _len(value):
+    if not isinstance(value, str):
+        raise TypeError("len применим только к строкам")
+    return len(value)
+
+
+BINARY_OPERATORS = {
+    "+": _add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+}
+
+# Имя функции -> (функция, минимальное число аргументов, максимальное или None)
+FUNCTIONS = {
+    "min": (min, 1, None),
+    "max": (max, 1, None),
+    "len": (_len, 1, 1),
+}
+
+
+class Expression:
+    """Скомпилированное выражение: замыкание evaluate(lookup) и множество свободных имен."""
+
+    __slots__ = ("source", "evaluate", "names", "name")
+
+    def __init__(self, source, evaluate, names, name=None):
+        self.source = source
+        self.evaluate = evaluate
+        self.names = names
+        # Если выражение - просто ссылка на имя, здесь хранится это имя
+        self.name = name
+
+    def __call__(self, lookup):
+        try:
+            return self.evaluate(lookup)
+        except ExpressionError:
+            raise
+        except (TypeError, ZeroDivisionError) as e:
+            raise ExpressionError(f"Ошибка вычисления выражения '{self.source}': {e}")
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+
+def tokenize(source):
+    """Разбивает выражение на токены (вид, значение) за один проход без регулярных выражений."""
+    tokens = []
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char.isspace():
+            i += 1
+        elif char.isdigit() or (char == "." and i + 1 < length and source[i + 1].isdigit()):
+            start = i
+            while i < length and (source[i].isdigit() or source[i] == "."):
+                i += 1
+            if i < length and source[i] in "eE":
+                i += 1
+                if i < length and source[i] in "+-":
+                    i += 1
+                while i < length and source[i].isdigit():
+                    i += 1
+            text = source[start:i]
+            try:
+                tokens.append(("number", float(text) if any(c in text for c in ".eE") else int(text)))
+            except ValueError:
+                raise ExpressionError(f"Некорректное число '{text}' в выражении '{source}'")
+        elif char.isalpha() or char == "_":
+            start = i
+            while i < length and (source[i].isalnum() or source[i] in "_."):
+                i += 1
+            tokens.append(("name", source[start:i]))
+        elif char in "\"'":
+            end = source.find(char, i + 1)
+            if end < 0:
+                raise ExpressionError(f"Незакрытая строка в выражении '{source}'")
+            tokens.append(("string", source[i + 1:end]))
+            i = end + 1
+        elif source.startswith("//", i):
+            tokens.append(("op", "//"))
+            i += 2
+        elif char in "+-*/%(),":
+            tokens.append(("op", char))
+            i += 1
+        else:
+            raise ExpressionError(f"Неожиданный символ '{char}' в выражении '{source}'")
+    tokens.append(("end", None))
+    return tokens
+
+
+class _Parser:
+    """Рекурсивный спуск, строящий дерево замыканий с предвычислением константных частей."""
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.pos = 0
+        self.names = set()
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, token = self.take()
+        if kind != "op" or token != value:
+            raise ExpressionError(f"Ожидалось '{value}' в выражении '{self.source}'")
+
+    def parse(self):
+        node = self.expression()
+        if self.peek()[0] != "end":
+            raise ExpressionError(f"Лишние символы в выражении '{self.source}'")
+        return node
+
+    # Узел дерева - пара (постоянное значение или None, замыкание)
+    def binary(self, next_level, operators):
+        left = next_level()
+        while self.peek()[0] == "op" and self.peek()[1] in operators:
+            left = self.combine(BINARY_OPERATORS[self.take()[1]], left, next_level())
+        return left
+
+    def expression(self):
+        return self.binary(self.term, ("+", "-"))
+
+    def term(self):
+        return self.binary(self.unary, ("*", "/", "//", "%"))
+
+    def unary(self):
+        kind, token = self.peek()
+        if kind == "op" and token in "+-":
+            self.take()
+            operand = self.unary()
+            if token == "+":
+                return operand
+            return self.combine(operator.neg, operand)
+        return self.primary()
+
+    def primary(self):
+        kind, token = self.take()
+        if kind in ("number", "string"):
+            return self.constant(token)
+        if kind == "name":
+            if self.peek() == ("op", "("):
+                return self.call(token)
+            self.names.add(token)
+            return None, lambda lookup: lookup(token)
+        if kind == "op" and token == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        raise ExpressionError(f"Неожиданный конец выражения '{self.source}'")
+
+    def call(self, name):
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Неизвестная функция {name} в выражении '{self.source}'")
+        function, min_args, max_args = FUNCTIONS[name]
+        self.expect("(")
+        args = []
+        if self.peek() != ("op", ")"):
+            args.append(self.expression())
+            while self.peek() == ("op", ","):
+                self.take()
+                args.append(self.expression())
+        self.expect(")")
+        if len(args) < min_args or (max_args is not None and len(args) > max_args):
+            raise ExpressionError(f"Неверное число аргументов {name} в выражении '{self.source}'")
+        return self.combine(function, *args)
+
+    def constant(self, value):
+        return value, lambda lookup: value
+
+    def combine(self, function, *operands):
+        """Создает узел; если все операнды известны, значение вычисляется сразу."""
+        if all(const is not None for const, _ in operands):
+            try:
+                return self.constant(function(*(const for const, _ in operands)))
+            except (TypeError, ZeroDivisionError) as e:
+                raise ExpressionError(f"Ошибка вычисления выражения '{self.source}': {e}")
+
+        evaluators = [evaluate for _, evaluate in operands]
+        if len(evaluators) == 1:
+            only = evaluators[0]
+            return None, lambda lookup: function(only(lookup))
+        if len(evaluators) == 2:
+            left, right = evaluators
+            return None, lambda lookup: function(left(lookup), right(lookup))
+        return None, lambda lookup: function(*(evaluate(lookup) for evaluate in evaluators))
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(source):
+    """Компилирует выражение один раз; повторные вызовы с тем же текстом берутся из кэша."""
+    source = source.strip()
+    if not source:
+        raise ExpressionError("Пустое выражение")
+    parser = _Parser(source)
+    _, evaluate = parser.parse()
+    tokens = parser.tokens
+    name = tokens[0][1] if len(tokens) == 2 and tokens[0][0] == "name" else None
+    return Expression(source, evaluate, frozenset(parser.names), name)
@@ -0,0 +1,275 @@
+import argparse
+import io
+import json
+import math
+
+PUNCTUATION = "()[]=,"
+DELIMITERS = " \t()[]=,"
+LITERALS = {"True": True, "False": False, "inf": math.inf, "-inf": -math.inf, "nan": math.nan}
+
+
+def _atom(text, line):
+    """Преобразует слово без кавычек в число, литерал или имя."""
+    first = text[0]
+    if first.isdigit() or first in "+-.":
+        try:
+            return "number", float(text) if any(c in text for c in ".eE") else int(text)
+        except ValueError:
+            if text in LITERALS:
+                return "number", LITERALS[text]
+            raise ValueError(f"Строка {line}: некорректное число {text}")
+    if first.isalpha() or first == "_":
+        return "name", text
+    raise ValueError(f"Строка {line}: неожиданный символ '{first}'")
+
+
+def tokenize(stream):
+    """Потоковый сканер целевого языка: читает построчно, не загружая файл целиком.
+
+    Возвращает тройки (вид, значение, номер строки). Отступы отбрасываются
+    str.lstrip, остальное разбирается посимвольно без регулярных выражений,
+    каждый символ просматривается один раз. Строка в кавычках может
+    продолжаться на следующих строках файла.
+    """
+    line_number = 0
+    pending = ""
+    for line in stream:
+        line_number += 1
+        # Отбрасываются только отступ и перевод строки: пробелы в конце могут быть внутри строки в кавычках
+        line = pending + line if pending else line.lstrip().rstrip("\r\n")
+        # Нечетное число кавычек - строковое значение продолжается на следующей строке
+        if line.count('"') % 2:
+            pending = line if pending else line + "\n"
+            continue
+        if pending:
+            pending = ""
+            line = line.strip()
+
+        pos = 0
+        length = len(line)
+        while pos < length:
+            char = line[pos]
+            if char in PUNCTUATION:
+                yield "op", char, line_number
+                pos += 1
+            elif char == " " or char == "\t":
+                pos += 1
+            elif char == '"':
+                end = line.index('"', pos + 1)
+                yield "string", line[pos + 1:end], line_number
+                pos = end + 1
+            else:
+                end = pos + 1
+                while end < length and line[end] not in DELIMITERS:
+                    end += 1
+                kind, value = _atom(line[pos:end], line_number)
+                yield kind, value, line_number
+                pos = end
+
+    if pending:
+        raise ValueError(f"Строка {line_number}: незакрытая строка")
+    yield "end", None, line_number
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.current = next(tokens)
+
+    def advance(self):
+        token = self.current
+        self.current = next(self.tokens)
+        return token
+
+    def error(self, message):
+        raise ValueError(f"Строка {self.current[2]}: {message}")
+
+    def is_op(self, op):
+        return self.current[0] == "op" and self.current[1] == op
+
+    def expect(self, op):
+        if not self.is_op(op):
+            self.error(f"ожидалось '{op}'")
+        self.advance()
+
+    def document(self):
+        value = self.value()
+        if self.current[0] != "end":
+            self.error("лишние данные после конца документа")
+        return value
+
+    def value(self):
+        kind, value, _ = self.current
+        if kind == "name" and value == "table":
+            return self.table()
+        if kind == "op" and value == "[":
+            return self.array()
+        if kind in ("number", "string"):
+            self.advance()
+            return value
+        if kind == "name" and value in LITERALS:
+            self.advance()
+            return LITERALS[value]
+        self.error(f"неожиданный токен {value!r}")
+
+    def table(self):
+        self.advance()
+        self.expect("(")
+        self.expect("[")
+        result = {}
+        while not self.is_op("]"):
+            kind, key, _ = self.advance()
+            if kind != "name":
+                self.error(f"ожидалось имя ключа, получено {key!r}")
+            self.expect("=")
+            result[key] = self.value()
+            if self.is_op(","):
+                self.advance()
+            elif not self.is_op("]"):
+                self.error("ожидалось ',' или ']'")
+        self.advance()
+        self.expect(")")
+        return result
+
+    def array(self):
+        self.advance()
+        items = []
+        while not self.is_op("]"):
+            items.append(self.value())
+            if self.is_op(","):
+                self.advance()
+            elif not self.is_op("]"):
+                self.error("ожидалось ',' или ']'")
+        self.advance()
+        return items
+
+
+def load(stream):
+    """Разбирает сгенерированный конфиг из текстового потока в структуры Python."""
+    return _Parser(tokenize(stream)).document()
+
+
+def loads(text):
+    return load(io.StringIO(text))
+
+
+def load_file(path):
+    with open(path, "r") as f:
+        return load(f)
+
+
+def _toml_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "nan"
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return repr(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key} = {_toml_value(item)}" for key, item in value.items()) + "}"
+    raise ValueError(f"Необработанный тип данных: {type(value)}")
+
+
+def dumps_toml(data):
+    """Записывает структуру в TOML: сначала значения таблицы, затем вложенные таблицы."""
+    lines = []
+    stack = [("", data)]
+    while stack:
+        path, table = stack.pop()
+        scalars = [(k, v) for k, v in table.items() if not isinstance(v, dict)]
+        tables = [(k, v) for k, v in table.items() if isinstance(v, dict)]
+        if path and (scalars or not tables):
+            if lines:
+                lines.append("")
+            lines.append(f"[{path}]")
+        for key, value in scalars:
+            lines.append(f"{key} = {_toml_value(value)}")
+        # В обратном порядке, чтобы вложенные таблицы выводились в исходном порядке
+        for key, value in reversed(tables):
+            stack.append((f"{path}.{key}" if path else key, value))
+    return "\n".join(lines) + "\n"
+
+
+def _same(expected, actual):
+    return type(expected) is type(actual) and (expected == actual or expected != expected and actual != actual)
+
+
+def compare(expected, actual, path="", limit=20):
+    """Сравнивает две структуры и возвращает список расхождений (не больше limit)."""
+    differences = []
+    stack = [(path, expected, actual)]
+    while stack and len(differences) < limit:
+        path, left, right = stack.pop()
+        where = path or "<корень>"
+        if isinstance(left, dict) and isinstance(right, dict):
+            if list(left) != list(right):
+                differences.append(f"{where}: ключи {list(left)} != {list(right)}")
+                continue
+            for key in reversed(list(left)):
+                stack.append((f"{path}.{key}" if path else key, left[key], right[key]))
+        elif isinstance(left, list) and isinstance(right, list):
+            if len(left) != len(right):
+                differences.append(f"{where}: длина массива {len(left)} != {len(right)}")
+                continue
+            for index in reversed(range(len(left))):
+                stack.append((f"{where}[{index}]", left[index], right[index]))
+        elif not _same(left, right):
+            differences.append(f"{where}: ожидалось {left!r}, получено {right!r}")
+    return differences
+
+
+def verify_roundtrip(transpiler, toml_data, output_file):
+    """Проверяет сгенерированный файл по входным данным без повторной генерации текста.
+
+    transpiler должен уже содержать разрешенные константы для toml_data.
+    """
+    expected = transpiler.materialize(toml_data)
+    actual = load_file(output_file)
+    return compare(expected, actual)
+
+
+def main():
+    # Импорт внутри функции, чтобы парсер можно было использовать без зависимостей транспилятора
+    try:
+        from .transpiler import ConfigTranspiler
+    except ImportError:
+        from transpiler import ConfigTranspiler
+
+    parser = argparse.ArgumentParser(description="Учебный конфигурационный язык обратно в TOML/JSON")
+    parser.add_argument("-i", "--input", required=True, help="Путь к сгенерированному файлу")
+    parser.add_argument("-o", "--output", help="Путь к результату (.toml или .json)")
+    parser.add_argument("--verify", metavar="TOML", help="Сверить файл с исходным TOML")
+    args = parser.parse_args()
+
+    if args.verify:
+        transpiler = ConfigTranspiler(args.verify, args.input, verbose=False)
+        with open(args.verify, "r") as f:
+            toml_data = transpiler.load_toml(f.read())
+        transpiler.extract_constants(toml_data)
+        transpiler.resolve_all_constants()
+        differences = verify_roundtrip(transpiler, toml_data, args.input)
+        for difference in differences:
+            print(difference)
+        if differences:
+            raise SystemExit(1)
+        print("Файл соответствует исходному TOML")
+
+    if args.output:
+        data = load_file(args.input)
+        with open(args.output, "w") as f:
+            if args.output.endswith(".json"):
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            else:
+                f.write(dumps_toml(data))
+
+
+if __name__ == "__main__":
+    main()
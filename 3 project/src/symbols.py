@@ -0,0 +1,125 @@
+import sys
+
+
+class Symbol:
+    """Именованное значение в области видимости таблицы."""
+
+    __slots__ = ("name", "qualname", "scope", "raw", "expr", "value", "resolved")
+
+    def __init__(self, name, qualname, scope, raw, expr=None):
+        self.name = name
+        self.qualname = qualname
+        self.scope = scope
+        # Исходное значение: число, строка-ссылка "#(...)" или текст выражения из def
+        self.raw = raw
+        # Скомпилированное выражение для ссылок и def, None для обычных чисел
+        self.expr = expr
+        self.value = None
+        self.resolved = False
+
+    def __repr__(self):
+        return f"Symbol({self.qualname}={self.raw!r})"
+
+
+class Scope:
+    """Область видимости одной таблицы TOML."""
+
+    __slots__ = ("path", "parent", "symbols")
+
+    def __init__(self, path, parent):
+        self.path = path
+        self.parent = parent
+        self.symbols = {}
+
+
+class SymbolTable:
+    """Таблица символов с лексическими областями видимости.
+
+    Каждая таблица документа - отдельная область со своим словарем имен.
+    Поиск идет от области ссылки к корню, затем по полному пути через точку,
+    затем по единственному определению имени во всем документе. Имена и пути
+    интернируются, индекс областей строится один раз при извлечении.
+    """
+
+    def __init__(self):
+        self.root = Scope("", None)
+        self.scopes = {"": self.root}
+        self.by_qualname = {}
+        self.by_name = {}
+        self.diagnostics = []
+        self._reported = set()
+
+    def __len__(self):
+        return len(self.by_qualname)
+
+    def __iter__(self):
+        return iter(self.by_qualname.values())
+
+    def scope(self, path):
+        """Возвращает область для пути таблицы, создавая ее и всех предков при необходимости."""
+        scope = self.scopes.get(path)
+        if scope is None:
+            parent = self.scope(path.rpartition(".")[0]) if "." in path else self.root
+            scope = Scope(sys.intern(path), parent)
+            self.scopes[scope.path] = scope
+        return scope
+
+    def nearest_scope(self, path):
+        """Ближайшая существующая область для пути (для элементов массивов и т.п.)."""
+        while path not in self.scopes:
+            path = path.rpartition(".")[0]
+        return self.scopes[path]
+
+    def define(self, scope, name, raw, expr=None):
+        """Добавляет символ в область; повторное определение в той же области заменяет прежнее."""
+        name = sys.intern(name)
+        qualname = sys.intern(f"{scope.path}.{name}" if scope.path else name)
+        symbol = Symbol(name, qualname, scope, raw, expr)
+
+        previous = scope.symbols.get(name)
+        if previous is not None:
+            self.report(f"Повторное определение {qualname}: используется последнее значение")
+            self.by_name[name].remove(previous)
+        scope.symbols[name] = symbol
+        self.by_qualname[qualname] = symbol
+        self.by_name.setdefault(name, []).append(symbol)
+        return symbol
+
+    def lookup(self, name, path=""):
+        """Находит символ, видимый из таблицы path, или None."""
+        scope = self.scopes.get(path)
+        if scope is None:
+            scope = self.nearest_scope(path)
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+
+        symbol = self.by_qualname.get(name)
+        if symbol is not None:
+            return symbol
+
+        candidates = self.by_name.get(name)
+        if not candidates:
+            return None
+        if len(candidates) > 1:
+            self.report(f"Неоднозначная ссылка #({name}) в {path or '<корень>'}: "
+                        f"{', '.join(s.qualname for s in candidates)}; используется {candidates[-1].qualname}")
+        return candidates[-1]
+
+    def check_shadowing(self):
+        """Сообщает о символах, скрывающих одноименные символы внешних областей."""
+        for symbol in self.by_qualname.values():
+            scope = symbol.scope.parent
+            while scope is not None:
+                outer = scope.symbols.get(symbol.name)
+                if outer is not None:
+                    self.report(f"Константа {symbol.qualname} затеняет {outer.qualname}")
+                    break
+                scope = scope.parent
+
+    def report(self, message):
+        if message not in self._reported:
+            self._reported.add(message)
+            self.diagnostics.append(message)
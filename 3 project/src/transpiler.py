@@ -1,140 +1,259 @@
 import argparse
-import toml
+import hashlib
+import logging
+import os
 import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.telemetry import configure, get_logger, metrics
+
+try:
+    from .backends import BACKENDS, ParserBackend, get_backend
+    from .expressions import ExpressionError, compile_expression
+    from .reverse import verify_roundtrip
+    from .symbols import SymbolTable
+except ImportError:
+    from backends import BACKENDS, ParserBackend, get_backend
+    from expressions import ExpressionError, compile_expression
+    from reverse import verify_roundtrip
+    from symbols import SymbolTable
+
+# Меняется при любом изменении формата вывода: инвалидирует кэш сборки
+TRANSPILER_VERSION = "1.3"
+
+log = get_logger("transpiler")
+
+
+def is_reference(value):
+    return isinstance(value, str) and value.startswith("#(") and value.endswith(")")
+
+
+def reference_name(value):
+    return value[2:-1].strip()
+
+
+def is_definition(value):
+    return isinstance(value, str) and value.startswith("def ") and ":=" in value
+
+
+def parse_definition(value):
+    """Разбирает строку вида "def NAME := выражение;" в пару (имя, текст выражения)."""
+    name, _, expression = value.partition(":=")
+    name = name.replace("def ", "", 1).strip()
+    expression = expression.strip()
+    if expression.endswith(";"):
+        expression = expression[:-1].strip()
+    return name, expression
+
+
+def compile_definition(expression):
+    """Компилирует тело def; одиночное слово, которое не разбирается как выражение (1.2.3), остается строкой."""
+    try:
+        return compile_expression(expression)
+    except ExpressionError:
+        if expression and not any(c.isspace() for c in expression):
+            return None
+        raise
 
 
 class ConfigTranspiler:
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, backend=None, shared_constants=None, verbose=True):
         self.input_file = input_file
         self.output_file = output_file
-        self.constants = {}
+        self.symbols = SymbolTable()
+        # Константы общих библиотек: используются, если имя не определено в самом файле
+        self.shared_constants = shared_constants if shared_constants is not None else {}
+        # Какие общие константы реально использованы файлом (зависимости для кэша)
+        self.used_shared = {}
+        self.verbose = verbose
+        self.backend = backend if isinstance(backend, ParserBackend) else get_backend(backend)
 
-    def transpile(self):
-        """Транспилирует TOML в целевой формат."""
+    def transpile(self, cache=None, verify=False):
+        """Транспилирует TOML в целевой формат.
+
+        Возвращает False, если кэш сборки подтвердил, что результат не изменится.
+        С verify=True записанный файл разбирается обратно и сверяется с входными данными.
+        """
+        with open(self.input_file, "rb") as f:
+            raw = f.read()
+
+        input_hash = None
+        if cache is not None:
+            input_hash = hashlib.sha256(raw).hexdigest()
+            if cache.is_fresh(self.input_file, self.output_file, input_hash, self.shared_constants):
+                metrics.count("transpiler.cache_hits")
+                if self.verbose:
+                    log.info("Файл не изменился, трансляция пропущена: %s", self.input_file)
+                return False
+
+        with metrics.timer("transpiler.convert"):
+            toml_data = self.load_toml(raw.decode("utf-8"))
+            result = self.convert(toml_data)
+
+        with open(self.output_file, "w") as f:
+            f.write(result)
+        if verify:
+            differences = verify_roundtrip(self, toml_data, self.output_file)
+            if differences:
+                raise ValueError("Результат не совпадает с исходными данными: " + "; ".join(differences))
+        if cache is not None:
+            cache.record(self.input_file, self.output_file, input_hash, self.used_shared)
+        if self.verbose:
+            log.info("Трансляция завершена. Результат записан в %s", self.output_file)
+        return True
+
+    def convert(self, toml_data):
+        """Преобразует разобранный TOML-документ в текст на целевом языке."""
+        # Сначала собираем все константы из всего файла
+        self.extract_constants(toml_data)
+
+        # Разрешаем все константы до обработки данных
+        self.resolve_all_constants()
+
+        # Затем обрабатываем данные
+        return self.process_data(toml_data)
+
+    def load_toml(self, text):
+        """Разбирает TOML выбранным бэкендом."""
         try:
-            with open(self.input_file, "r") as f:
-                toml_data = toml.load(f)
-            
-            # Сначала собираем все константы из всего файла
-            self.extract_constants(toml_data)
-            
-            # Разрешаем все константы до обработки данных
-            self.resolve_all_constants()
-            
-            # Затем обрабатываем данные
-            result = self.process_data(toml_data)
-            
-            with open(self.output_file, "w") as f:
-                f.write(result)
-            print("Трансляция завершена. Результат записан в", self.output_file)
-        except toml.TomlDecodeError as e:
+            return self.backend.loads(text)
+        except self.backend.errors as e:
             raise ValueError(f"Ошибка синтаксиса TOML: {e}")
-        except Exception as e:
-            raise
 
     def extract_constants(self, data, path=""):
         """Извлекает все константы из данных, включая значения, которые можно использовать как константы."""
         if isinstance(data, dict):
+            scope = self.symbols.scope(path)
             for key, value in data.items():
                 current_path = f"{path}.{key}" if path else key
-                
-                # Сохраняем числовые значения как константы
+
+                # Числовые значения и ссылки видны в области своей таблицы
                 if isinstance(value, (int, float)):
-                    self.constants[current_path] = str(value)
-                    self.constants[key] = str(value)  # Также сохраняем по короткому имени
-                # Обрабатываем определения констант
-                elif isinstance(value, str) and value.startswith("def ") and ":=" in value:
-                    const_name = value.split(":=")[0].replace("def ", "").strip()
-                    const_value = value.split(":=")[1].strip().rstrip(";").strip()
-                    try:
-                        # Пробуем преобразовать в число, если возможно
-                        if '.' in const_value:
-                            const_value = float(const_value)
-                        else:
-                            const_value = int(const_value)
-                    except ValueError:
-                        # Если не получилось, оставляем как строку
-                        const_value = const_value.strip('"')
-                    self.constants[const_name] = str(const_value)
-                # Сохраняем ссылки на константы как есть
-                elif isinstance(value, str) and value.startswith("#(") and value.endswith(")"):
-                    self.constants[current_path] = value
-                    self.constants[key] = value
-                
+                    self.symbols.define(scope, key, value)
+                elif is_reference(value):
+                    self.symbols.define(scope, key, value, compile_expression(reference_name(value)))
+                # Определения констант (def) помещаются в корневую область
+                elif is_definition(value):
+                    const_name, expression = parse_definition(value)
+                    self.symbols.define(self.symbols.root, const_name, expression, compile_definition(expression))
+
                 # Рекурсивно обрабатываем вложенные структуры
                 self.extract_constants(value, current_path)
         elif isinstance(data, list):
-            # Обрабатываем каждый элемент списка
-            for item in data:
-                self.extract_constants(item, path)
+            # У каждого элемента списка (например, массива таблиц) своя область: servers[0], servers[1]
+            for index, item in enumerate(data):
+                self.extract_constants(item, f"{path}[{index}]")
 
     def resolve_all_constants(self):
         """Разрешает все константы перед обработкой данных."""
-        print("Initial constants:", self.constants)  # Debug
-        
-        # Повторяем процесс разрешения, пока есть изменения
-        changes = True
-        while changes:
-            changes = False
-            resolved = {}
-            
-            for name, value in self.constants.items():
-                if isinstance(value, str) and value.startswith("#("):
-                    try:
-                        resolved_value = str(self.resolve_constant(value))
-                        if resolved_value != value:
-                            resolved[name] = resolved_value
-                            changes = True
-                            print(f"Resolved {name}: {value} -> {resolved_value}")  # Debug
-                    except ValueError:
-                        # Пропускаем неразрешенные константы, попробуем позже
-                        continue
-            
-            # Обновляем словарь констант разрешенными значениями
-            self.constants.update(resolved)
-            print("Current constants:", self.constants)  # Debug
-        
-        # Проверяем, остались ли неразрешенные константы
-        for name, value in self.constants.items():
-            if isinstance(value, str) and value.startswith("#("):
-                raise ValueError(f"Не удалось разрешить константу {name}: {value}")
-
-    def resolve_constant(self, value, path="", visited=None):
-        """Разрешает значение константы, если это ссылка на константу."""
-        if visited is None:
-            visited = set()
-
-        if isinstance(value, str) and value.startswith("#(") and value.endswith(")"):
-            const_name = value[2:-1].strip()
-            
-            # Проверяем циклические зависимости
-            if const_name in visited:
-                raise ValueError(f"Обнаружена циклическая зависимость: {const_name}")
-            visited.add(const_name)
-            
-            # Пробуем найти константу по полному пути или короткому имени
-            if const_name in self.constants:
-                const_value = self.constants[const_name]
+        self.symbols.check_shadowing()
+        for symbol in self.symbols:
+            self.resolve_symbol(symbol)
+
+        if self.verbose:
+            # Словарь всех констант строится, только если отладочный вывод кому-то нужен
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Resolved constants: %s", {s.qualname: s.value for s in self.symbols})
+            for message in self.symbols.diagnostics:
+                log.warning("Предупреждение: %s", message)
+
+    def lookup_reference(self, name, path):
+        """Находит символ, на который ссылается #(name) из таблицы path."""
+        return self.symbols.lookup(name, path)
+
+    def resolve_symbol(self, symbol):
+        """Вычисляет символ и все его зависимости в порядке зависимостей, без рекурсии."""
+        if symbol.resolved:
+            return symbol.value
+
+        stack = [symbol]
+        active = {symbol.qualname}
+        while stack:
+            current = stack[-1]
+            pending = None
+            if current.expr is not None:
+                for name in current.expr.names:
+                    target = self.lookup_reference(name, current.scope.path)
+                    if target is not None and not target.resolved:
+                        pending = target
+                        break
+
+            if pending is not None:
+                if pending.qualname in active:
+                    raise ValueError(f"Обнаружена циклическая зависимость: {pending.qualname}")
+                active.add(pending.qualname)
+                stack.append(pending)
+                continue
+
+            # Все зависимости уже вычислены
+            if current.expr is None or self.is_literal_word(current):
+                current.value = current.raw
             else:
-                full_path = f"{path}.{const_name}" if path else const_name
-                if full_path in self.constants:
-                    const_value = self.constants[full_path]
-                else:
-                    raise ValueError(f"Неопределенная константа: {const_name}")
-            
-            # Если значение само является ссылкой на константу, разрешаем рекурсивно
-            if isinstance(const_value, str) and const_value.startswith("#("):
-                return self.resolve_constant(const_value, path, visited)
-            
-            # Преобразуем строковое представление в соответствующий тип
-            try:
-                if '.' in const_value:
-                    return float(const_value)
-                return int(const_value)
-            except ValueError:
-                return const_value
+                current.value = self.evaluate(current.expr, current.scope.path)
+            current.resolved = True
+            active.discard(current.qualname)
+            stack.pop()
+        return symbol.value
+
+    def is_literal_word(self, symbol):
+        """def NAME := слово; без константы с таким именем - строка "слово", как и до появления выражений."""
+        name = symbol.expr.name
+        return (name is not None and symbol.raw == name and name not in self.shared_constants
+                and self.lookup_reference(name, symbol.scope.path) is None)
+
+    def reference_value(self, name, path):
+        """Значение имени, видимого из таблицы path."""
+        symbol = self.lookup_reference(name, path)
+        if symbol is None:
+            return self.resolve_shared(name)
+        return symbol.value if symbol.resolved else self.resolve_symbol(symbol)
+
+    def evaluate(self, expr, path):
+        if expr.name is not None:
+            return self.reference_value(expr.name, path)
+        return expr(lambda name: self.reference_value(name, path))
+
+    def resolve_shared(self, name):
+        """Значение из общих библиотек констант; использование запоминается для кэша."""
+        if name not in self.shared_constants:
+            raise ValueError(f"Неопределенная константа: {name}")
+        value = self.shared_constants[name]
+        self.used_shared[name] = value
         return value
 
+    def resolve_constant(self, value, path=""):
+        """Разрешает значение, если это ссылка или выражение вида #(...)."""
+        if not is_reference(value):
+            return value
+        return self.evaluate(compile_expression(reference_name(value)), path)
+
+    def materialize(self, data, path=""):
+        """Возвращает данные в том виде, в каком они попадают в вывод: без def и с вычисленными ссылками."""
+        if isinstance(data, dict):
+            result = {}
+            for key, value in data.items():
+                if is_definition(value):
+                    continue
+                current_path = f"{path}.{key}" if path else key
+                result[key] = self.materialize(self.resolve_constant(value, path), current_path)
+            return result
+        if isinstance(data, list):
+            return [self.materialize(self.resolve_constant(item, path), f"{path}[{index}]")
+                    for index, item in enumerate(data)]
+        return data
+
+    def export_constants(self):
+        """Возвращает разрешенные константы по полному и короткому имени (для общих библиотек)."""
+        exported = {}
+        for symbol in self.symbols:
+            exported[symbol.qualname] = symbol.value
+            exported.setdefault(symbol.name, symbol.value)
+        return exported
+
     def process_data(self, data, level=0, path=""):
         """Обрабатывает данные и возвращает результат в целевом формате."""
         output = []
@@ -149,7 +268,7 @@ class ConfigTranspiler:
                     raise ValueError(f"Некорректное имя ключа: {key}")
                 
                 # Пропускаем определения констант
-                if isinstance(value, str) and value.startswith("def ") and ":=" in value:
+                if is_definition(value):
                     continue
                 
                 # Разрешаем константы
@@ -160,16 +279,16 @@ class ConfigTranspiler:
             output.append(f"{indent}])")
         elif isinstance(data, list):
             items = []
-            for item in data:
+            for index, item in enumerate(data):
                 resolved_item = self.resolve_constant(item, path)
-                processed_item = self.process_data(resolved_item, 0, path).lstrip()
+                processed_item = self.process_data(resolved_item, 0, f"{path}[{index}]").lstrip()
                 items.append(processed_item)
             return f"[{', '.join(items)}]"
         elif isinstance(data, (int, float)):
             output.append(str(data))
         elif isinstance(data, str):
             # Проверяем, не является ли строка определением константы
-            if not (data.startswith("def ") and ":=" in data):
+            if not is_definition(data):
                 output.append(f'"{data}"')
         else:
             raise ValueError(f"Необработанный тип данных: {type(data)}")
@@ -182,13 +301,55 @@ class ConfigTranspiler:
 
 
 def main():
+    # Импорт внутри функции: модуль batch сам импортирует ConfigTranspiler
+    try:
+        from .batch import is_batch_input, load_shared_constants, transpile_batch
+        from .cache import BuildCache
+        from .watch import WatchSession
+    except ImportError:
+        from batch import is_batch_input, load_shared_constants, transpile_batch
+        from cache import BuildCache
+        from watch import WatchSession
+
     parser = argparse.ArgumentParser(description="TOML в учебный конфигурационный язык")
-    parser.add_argument("-i", "--input", required=True, help="Путь к входному TOML-файлу")
-    parser.add_argument("-o", "--output", required=True, help="Путь к выходному файлу")
+    parser.add_argument("-i", "--input", required=True, nargs="+",
+                        help="Путь к входному TOML-файлу; для пакетного режима - каталоги или маски")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Путь к выходному файлу; в пакетном режиме - выходной каталог")
+    parser.add_argument("-b", "--backend", default="auto", choices=["auto", *BACKENDS],
+                        help="Парсер TOML (по умолчанию самый быстрый из установленных)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Количество процессов в пакетном режиме (по умолчанию по числу ядер)")
+    parser.add_argument("-c", "--constants", action="append", default=[],
+                        help="Общая библиотека констант (можно указать несколько раз)")
+    parser.add_argument("--report", help="Путь к JSON-отчету пакетной трансляции")
+    parser.add_argument("--cache", help="Путь к манифесту кэша сборки: неизмененные файлы пропускаются")
+    parser.add_argument("--verify", action="store_true",
+                        help="Разобрать результат обратно и сверить его с входным TOML")
+    parser.add_argument("--watch", action="store_true", help="Следить за входным файлом и перетранслировать при изменении")
+    parser.add_argument("--interval", type=float, default=0.5, help="Период опроса файла в режиме --watch, с")
     args = parser.parse_args()
+    configure()
+
+    if is_batch_input(args.input):
+        report = transpile_batch(args.input, args.output, args.jobs, args.constants, args.backend, args.cache)
+        log.info("%s", report.summary())
+        if args.report:
+            report.save(args.report)
+        if not report.ok:
+            raise SystemExit(1)
+        return
+
+    shared_constants = load_shared_constants(args.constants, args.backend)
+    if args.watch:
+        WatchSession(args.input[0], args.output, args.backend, shared_constants, args.interval).run()
+        return
 
-    transpiler = ConfigTranspiler(args.input, args.output)
-    transpiler.transpile()
+    transpiler = ConfigTranspiler(args.input[0], args.output, args.backend, shared_constants)
+    cache = BuildCache(args.cache) if args.cache else None
+    transpiler.transpile(cache, args.verify)
+    if cache is not None:
+        cache.save()
 
 
 if __name__ == "__main__":
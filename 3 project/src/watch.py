@@ -0,0 +1,206 @@
+import hashlib
+import os
+import time
+from collections import defaultdict
+
+try:
+    from .symbols import SymbolTable
+    from .transpiler import ConfigTranspiler
+except ImportError:
+    from symbols import SymbolTable
+    from transpiler import ConfigTranspiler
+
+from common.telemetry import get_logger
+
+log = get_logger("transpiler.watch")
+
+
+def same_value(a, b):
+    """Сравнение с учетом типа и порядка ключей: от них зависит вывод (1 и 1.0 выводятся по-разному)."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(same_value(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(map(same_value, a, b))
+    return a == b
+
+
+class IncrementalTranspiler(ConfigTranspiler):
+    """Транспилятор, который хранит документ и граф констант между запусками.
+
+    При обновлении заново разрешаются только константы, чьи определения или
+    транзитивные ссылки изменились, а таблицы, не затронутые изменениями,
+    берутся из кэша уже сгенерированного текста.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Полное имя символа-выражения -> полные имена символов, на которые оно ссылается
+        self.bindings = {}
+        # (путь, уровень) -> (исходная таблица, использованные имена, текст)
+        self.render_cache = {}
+        self.dirty = set()
+        self.refs = None
+        self.resolved_count = 0
+        self.reused_count = 0
+
+    def bind(self):
+        """Связывает каждую ссылку с символом-целью."""
+        bindings = {}
+        for symbol in self.symbols:
+            if symbol.expr is not None:
+                targets = []
+                for name in sorted(symbol.expr.names):
+                    target = self.symbols.lookup(name, symbol.scope.path)
+                    targets.append(target.qualname if target is not None else None)
+                bindings[symbol.qualname] = tuple(targets)
+        return bindings
+
+    def convert(self, toml_data):
+        """Полная трансляция с заполнением кэшей."""
+        self.symbols = SymbolTable()
+        self.extract_constants(toml_data)
+        self.resolve_all_constants()
+        self.bindings = self.bind()
+        self.resolved_count = len(self.symbols)
+        self.render_cache = {}
+        self.dirty = set()
+        return self.render(toml_data)
+
+    def update(self, toml_data):
+        """Инкрементальная трансляция измененного документа."""
+        old_symbols, old_bindings = self.symbols, self.bindings
+        try:
+            self.symbols = SymbolTable()
+            self.extract_constants(toml_data)
+            self.symbols.check_shadowing()
+            self.bindings = self.bind()
+
+            old, new = old_symbols.by_qualname, self.symbols.by_qualname
+            changed = {
+                name for name in old.keys() | new.keys()
+                if name not in old or name not in new
+                or not same_value(old[name].raw, new[name].raw)
+                or old_bindings.get(name) != self.bindings.get(name)
+            }
+
+            # Замыкание по обратному графу: все, кто прямо или транзитивно ссылается на измененные
+            graph = defaultdict(set)
+            for name, targets in self.bindings.items():
+                for target in targets:
+                    graph[target].add(name)
+            affected = set(changed)
+            stack = list(changed)
+            while stack:
+                for dependent in graph.get(stack.pop(), ()):
+                    if dependent not in affected:
+                        affected.add(dependent)
+                        stack.append(dependent)
+
+            for name, symbol in new.items():
+                if name not in affected:
+                    symbol.value = old[name].value
+                    symbol.resolved = True
+            for name in affected:
+                if name in new:
+                    self.resolve_symbol(new[name])
+            self.resolved_count = len(affected & new.keys())
+
+            # Для проверки кэша таблиц важны и полные, и короткие имена изменившихся значений
+            self.dirty = set()
+            for name in affected:
+                before, after = old.get(name), new.get(name)
+                if before is None or after is None or not same_value(before.value, after.value):
+                    self.dirty.add(name)
+                    self.dirty.add((before or after).name)
+            return self.render(toml_data)
+        except Exception:
+            self.symbols, self.bindings = old_symbols, old_bindings
+            raise
+
+    def render(self, toml_data):
+        self.reused_count = 0
+        self.refs = set()
+        try:
+            return self.process_data(toml_data)
+        finally:
+            self.refs = None
+
+    def lookup_reference(self, name, path):
+        if self.refs is not None:
+            self.refs.add(name)
+        return super().lookup_reference(name, path)
+
+    def process_data(self, data, level=0, path=""):
+        if not isinstance(data, dict):
+            return super().process_data(data, level, path)
+
+        key = (path, level)
+        cached = self.render_cache.get(key)
+        if cached is not None and same_value(cached[0], data) and not (cached[1] & self.dirty):
+            self.reused_count += 1
+            self.refs |= cached[1]
+            return cached[2]
+
+        outer_refs, self.refs = self.refs, set()
+        text = super().process_data(data, level, path)
+        refs, self.refs = self.refs, outer_refs | self.refs
+        self.render_cache[key] = (data, refs, text)
+        return text
+
+
+class WatchSession:
+    """Следит за входным файлом и перетранслирует его при каждом сохранении."""
+
+    def __init__(self, input_file, output_file, backend=None, shared_constants=None, interval=0.5):
+        self.transpiler = IncrementalTranspiler(input_file, output_file, backend, shared_constants, verbose=False)
+        self.interval = interval
+        self.stamp = None
+        self.digest = None
+        self.built = False
+
+    def rebuild(self):
+        """Перечитывает файл и обновляет результат; возвращает False, если содержимое не изменилось."""
+        with open(self.transpiler.input_file, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).digest()
+        if digest == self.digest:
+            return False
+
+        toml_data = self.transpiler.load_toml(raw.decode("utf-8"))
+        if self.built:
+            result = self.transpiler.update(toml_data)
+        else:
+            result = self.transpiler.convert(toml_data)
+            self.built = True
+        self.digest = digest
+
+        with open(self.transpiler.output_file, "w") as f:
+            f.write(result)
+        return True
+
+    def poll(self):
+        """Проверяет метку времени файла и при изменении перестраивает результат."""
+        stat = os.stat(self.transpiler.input_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        return self.rebuild()
+
+    def run(self):
+        log.info("Наблюдение за %s (Ctrl+C для выхода)", self.transpiler.input_file)
+        try:
+            while True:
+                try:
+                    if self.poll():
+                        log.info("Обновлено %s: констант разрешено %s, таблиц из кэша %s",
+                                 self.transpiler.output_file, self.transpiler.resolved_count,
+                                 self.transpiler.reused_count)
+                except (ValueError, OSError) as e:
+                    # Ошибка в процессе редактирования не должна останавливать наблюдение
+                    log.error("Ошибка: %s", e)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
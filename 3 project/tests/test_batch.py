@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.batch import collect_inputs, transpile_batch
+
+
+class TestBatchTranspile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "configs")
+        self.output_dir = os.path.join(self.temp_dir, "out")
+        os.makedirs(os.path.join(self.input_dir, "services"))
+
+        self.write(os.path.join(self.input_dir, "root.toml"), '''
+[example]
+key1 = 42
+key2 = "#(key1)"
+''')
+        self.write(os.path.join(self.input_dir, "services", "api.toml"), '''
+[api]
+timeout = "#(DEFAULT_TIMEOUT)"
+''')
+        self.library = os.path.join(self.temp_dir, "constants.toml")
+        self.write(self.library, '''
+[constants]
+const_def = "def DEFAULT_TIMEOUT := 30;"
+''')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path, "r") as f:
+            return f.read()
+
+    def test_collect_inputs_mirrors_tree(self):
+        inputs = collect_inputs([self.input_dir])
+        relative = sorted(rel for _, rel in inputs)
+        self.assertEqual(relative, ["root.toml", os.path.join("services", "api.toml")])
+
+    def test_batch_with_shared_constants(self):
+        for jobs in (1, 2):
+            report = transpile_batch([self.input_dir], self.output_dir, jobs=jobs, shared_paths=[self.library])
+            self.assertTrue(report.ok, report.summary())
+            self.assertEqual(len(report.succeeded), 2)
+
+            result = self.read(os.path.join(self.output_dir, "services", "api.txt"))
+            self.assertIn("timeout = 30,", result)
+            self.assertIn("key2 = 42,", self.read(os.path.join(self.output_dir, "root.txt")))
+
+    def test_batch_reports_failures(self):
+        report = transpile_batch([os.path.join(self.input_dir, "**", "*.toml")], self.output_dir, jobs=1)
+        self.assertFalse(report.ok)
+        self.assertEqual(len(report.failed), 1)
+        self.assertTrue(report.failed[0]["input"].endswith("api.toml"))
+
+    def test_batch_rejects_colliding_outputs(self):
+        other_dir = os.path.join(self.temp_dir, "other")
+        os.makedirs(other_dir)
+        self.write(os.path.join(other_dir, "root.toml"), "[other]\nkey = 1\n")
+        inputs = [os.path.join(self.input_dir, "root.toml"), os.path.join(other_dir, "root.toml")]
+        for jobs in (1, 2):
+            report = transpile_batch(inputs, self.output_dir, jobs=jobs)
+            self.assertEqual(report.succeeded, [])
+            self.assertEqual(sorted(entry["input"] for entry in report.failed), sorted(inputs))
+            self.assertFalse(os.path.exists(os.path.join(self.output_dir, "root.txt")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.batch import transpile_batch
+from src.cache import BuildCache
+from src.transpiler import ConfigTranspiler
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "configs")
+        self.output_dir = os.path.join(self.temp_dir, "out")
+        self.cache_path = os.path.join(self.temp_dir, "cache.json")
+        os.makedirs(self.input_dir)
+        self.library = os.path.join(self.temp_dir, "constants.toml")
+
+        self.write(os.path.join(self.input_dir, "api.toml"), '[api]\ntimeout = "#(TIMEOUT)"\n')
+        self.write(os.path.join(self.input_dir, "db.toml"), '[db]\nport = 5432\n')
+        self.write(self.library, '[constants]\nconst_def = "def TIMEOUT := 30;"\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self):
+        return transpile_batch([self.input_dir], self.output_dir, jobs=1,
+                               shared_paths=[self.library], cache_path=self.cache_path)
+
+    def test_unchanged_files_are_skipped(self):
+        self.assertEqual(len(self.build().succeeded), 2)
+        report = self.build()
+        self.assertEqual(len(report.succeeded), 0)
+        self.assertEqual(len(report.skipped), 2)
+
+    def test_changed_input_is_rebuilt(self):
+        self.build()
+        self.write(os.path.join(self.input_dir, "db.toml"), '[db]\nport = 6543\n')
+        report = self.build()
+        self.assertEqual([os.path.basename(e["input"]) for e in report.succeeded], ["db.toml"])
+
+    def test_shared_constant_change_rebuilds_dependents(self):
+        self.build()
+        self.write(self.library, '[constants]\nconst_def = "def TIMEOUT := 60;"\n')
+        report = self.build()
+        self.assertEqual([os.path.basename(e["input"]) for e in report.succeeded], ["api.toml"])
+        with open(os.path.join(self.output_dir, "api.txt"), "r") as f:
+            self.assertIn("timeout = 60,", f.read())
+
+    def test_single_file_transpile(self):
+        input_file = os.path.join(self.input_dir, "db.toml")
+        output_file = os.path.join(self.temp_dir, "db.txt")
+        cache = BuildCache(self.cache_path)
+        self.assertTrue(ConfigTranspiler(input_file, output_file, verbose=False).transpile(cache))
+        self.assertFalse(ConfigTranspiler(input_file, output_file, verbose=False).transpile(cache))
+
+        os.remove(output_file)
+        self.assertTrue(ConfigTranspiler(input_file, output_file, verbose=False).transpile(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from src.expressions import ExpressionError, compile_expression
+
+
+class TestExpressions(unittest.TestCase):
+    def evaluate(self, source, **names):
+        return compile_expression(source)(names.__getitem__)
+
+    def test_arithmetic(self):
+        self.assertEqual(self.evaluate("2 * (3 + 4) - 1"), 13)
+        self.assertEqual(self.evaluate("7 // 2 + 7 % 2"), 4)
+        self.assertEqual(self.evaluate("-x + 10", x=3), 7)
+        self.assertAlmostEqual(self.evaluate("1 / 4"), 0.25)
+
+    def test_strings_and_functions(self):
+        self.assertEqual(self.evaluate('"db" + "-" + name', name="main"), "db-main")
+        self.assertEqual(self.evaluate("len(name)", name="main"), 4)
+        self.assertEqual(self.evaluate("min(a, b, 3)", a=5, b=4), 3)
+        self.assertEqual(self.evaluate("max(a, 10)", a=5), 10)
+
+    def test_free_names(self):
+        expr = compile_expression("min(server.port, LIMIT) + 1")
+        self.assertEqual(expr.names, {"server.port", "LIMIT"})
+        self.assertIsNone(expr.name)
+        self.assertEqual(compile_expression("LIMIT").name, "LIMIT")
+
+    def test_compiled_once(self):
+        self.assertIs(compile_expression("a + 1"), compile_expression("a + 1"))
+
+    def test_errors(self):
+        for source in ["1 +", "(1", "foo(1)", "len(1, 2)", "1 ? 2", '"open']:
+            with self.assertRaises(ExpressionError):
+                compile_expression(source)
+        with self.assertRaises(ExpressionError):
+            self.evaluate('"a" + x', x=1)
+        with self.assertRaises(ExpressionError):
+            self.evaluate("x / 0", x=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
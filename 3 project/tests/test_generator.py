@@ -0,0 +1,22 @@
+import unittest
+from benchmarks.generator import GENERATORS, generate
+from src.transpiler import ConfigTranspiler
+
+
+class TestSyntheticGenerator(unittest.TestCase):
+    def test_generated_documents_transpile(self):
+        for kind in GENERATORS:
+            with self.subTest(kind=kind):
+                transpiler = ConfigTranspiler(None, None, verbose=False)
+                data = transpiler.load_toml(generate(kind, 200))
+                result = transpiler.convert(data)
+                self.assertTrue(result.startswith("table(["))
+
+    def test_constant_chain_value(self):
+        transpiler = ConfigTranspiler(None, None, verbose=False)
+        transpiler.convert(transpiler.load_toml(generate("constant_chain", 500)))
+        self.assertEqual(transpiler.symbols.lookup("last", "usage").value, 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import tomllib
+from src.reverse import compare, dumps_toml, load, loads
+from src.transpiler import ConfigTranspiler
+
+
+class TestReverseParser(unittest.TestCase):
+    def setUp(self):
+        self.test_input = "test_input.toml"
+        self.test_output = "test_output.txt"
+
+    def tearDown(self):
+        for file in [self.test_input, self.test_output]:
+            if os.path.exists(file):
+                os.remove(file)
+
+    def test_parse_generated_output(self):
+        text = '''table([
+    database = table([
+        host = "localhost",
+        ratio = 0.5,
+        ports = [1024, -3306],
+        flags = [True, False],
+        empty = table([
+        ]),
+    ]),
+])'''
+        expected = {"database": {"host": "localhost", "ratio": 0.5, "ports": [1024, -3306],
+                                 "flags": [True, False], "empty": {}}}
+        self.assertEqual(loads(text), expected)
+
+    def test_multiline_string(self):
+        self.assertEqual(loads('table([\n    text = "first\n  second",\n])'), {"text": "first\n  second"})
+        # Пробелы в конце первой строки принадлежат значению
+        self.assertEqual(loads('table([\n    text = "first   \n  second",\n])'), {"text": "first   \n  second"})
+
+    def test_syntax_errors(self):
+        for text in ["table([ key = 1", "table([ key 1 ])", "[1, 2", "table([ key = @ ])", "[1] [2]"]:
+            with self.assertRaises(ValueError):
+                loads(text)
+
+    def test_dumps_toml(self):
+        data = {"title": "cfg", "server": {"port": 80, "limits": [1, 2], "tls": {"enabled": True}}}
+        self.assertEqual(tomllib.loads(dumps_toml(data)), data)
+
+    def test_transpile_with_verification(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[constants]
+const_def = "def SIZE := 4 * 1024;"
+
+[server]
+buffer = "#(SIZE)"
+ports = [80, 443]
+
+[server.tls]
+ratio = 0.25
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output, verbose=False)
+        transpiler.transpile(verify=True)
+
+        with open(self.test_output, "r") as f:
+            result = load(f)
+        self.assertEqual(result["server"], {"buffer": 4096, "ports": [80, 443], "tls": {"ratio": 0.25}})
+
+    def test_compare_reports_differences(self):
+        differences = compare({"a": 1, "b": [1, 2]}, {"a": 1.0, "b": [1]})
+        self.assertEqual(len(differences), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
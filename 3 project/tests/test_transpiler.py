@@ -1,6 +1,7 @@
 import unittest
 import os
 from src.transpiler import ConfigTranspiler
+from src.backends import available_backends
 
 
 class TestConfigTranspiler(unittest.TestCase):
@@ -165,6 +166,199 @@ another_key = 200
 ])'''
         self.assertEqual(result.strip(), expected.strip())
 
+    def test_backends_agree(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[example]
+key1 = 42
+key2 = "#(key1)"
+''')
+
+        results = []
+        for backend in available_backends():
+            transpiler = ConfigTranspiler(self.test_input, self.test_output, backend)
+            transpiler.transpile()
+            with open(self.test_output, "r") as f:
+                results.append(f.read())
+
+        self.assertTrue(results)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ConfigTranspiler(self.test_input, self.test_output, "unknown")
+
+    def test_syntax_error(self):
+        with open(self.test_input, "w") as f:
+            f.write("[example\nkey = ")
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output)
+        with self.assertRaises(ValueError):
+            transpiler.transpile()
+
+    def test_lexical_scope_resolution(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[first]
+port = 1
+ref = "#(port)"
+
+[second]
+port = 2
+ref = "#(port)"
+absolute = "#(first.port)"
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output)
+        transpiler.transpile()
+
+        with open(self.test_output, "r") as f:
+            result = f.read()
+
+        expected = '''table([
+    first = table([
+        port = 1,
+        ref = 1,
+    ]),
+    second = table([
+        port = 2,
+        ref = 2,
+        absolute = 1,
+    ]),
+])'''
+        self.assertEqual(result.strip(), expected.strip())
+
+    def test_shadowing_diagnostics(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[outer]
+limit = 10
+value = "#(limit)"
+
+[outer.inner]
+limit = 20
+value = "#(limit)"
+
+[other]
+limit = 30
+
+[user]
+value = "#(limit)"
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output, verbose=False)
+        transpiler.transpile()
+
+        diagnostics = transpiler.symbols.diagnostics
+        self.assertTrue(any("outer.inner.limit" in d and "затеняет" in d for d in diagnostics))
+        self.assertTrue(any("Неоднозначная" in d for d in diagnostics))
+        self.assertEqual(transpiler.symbols.lookup("value", "outer.inner").value, 20)
+        self.assertEqual(transpiler.symbols.lookup("value", "outer").value, 10)
+
+    def test_array_of_tables_scopes(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[[servers]]
+port = 1
+ref = "#(port)"
+
+[[servers]]
+port = 2
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output, verbose=False)
+        transpiler.transpile()
+
+        # Каждый элемент массива таблиц - отдельная область видимости
+        self.assertEqual(transpiler.symbols.lookup("ref", "servers[0]").value, 1)
+        self.assertFalse(any("Повторное определение" in d for d in transpiler.symbols.diagnostics))
+
+    def test_long_constant_chain(self):
+        lines = ["[chain]", "c0 = 1"]
+        lines += [f'c{i} = "#(c{i - 1})"' for i in range(1, 5000)]
+        with open(self.test_input, "w") as f:
+            f.write("\n".join(lines))
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output, verbose=False)
+        transpiler.transpile()
+        self.assertEqual(transpiler.symbols.lookup("c4999", "chain").value, 1)
+
+    def test_circular_reference(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[test]
+a = "#(b)"
+b = "#(a)"
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output, verbose=False)
+        with self.assertRaises(ValueError):
+            transpiler.transpile()
+
+    def test_constant_expressions(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[constants]
+page = "def PAGE := 4096;"
+pages = "def PAGES := PAGE * 16;"
+prefix = "def PREFIX := \\"cache\\" + \\"-\\";"
+
+[cache]
+size = "#(PAGES + PAGE)"
+name = "#(PREFIX + \\"main\\")"
+name_len = "#(len(PREFIX))"
+limits = ["#(min(PAGE, 1000))", "#(max(PAGE, 1000))"]
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output)
+        transpiler.transpile()
+
+        with open(self.test_output, "r") as f:
+            result = f.read()
+
+        expected = '''table([
+    constants = table([
+    ]),
+    cache = table([
+        size = 69632,
+        name = "cache-main",
+        name_len = 6,
+        limits = [1000, 4096],
+    ]),
+])'''
+        self.assertEqual(result.strip(), expected.strip())
+
+    def test_bare_word_definitions_stay_strings(self):
+        with open(self.test_input, "w") as f:
+            f.write('''
+[constants]
+name = "def NAME := hello;"
+version = "def VER := 1.2.3;"
+port = "def PORT := 80;"
+alias = "def ALIAS := PORT;"
+
+[app]
+name = "#(NAME)"
+version = "#(VER)"
+alias = "#(ALIAS)"
+''')
+
+        transpiler = ConfigTranspiler(self.test_input, self.test_output)
+        transpiler.transpile()
+
+        with open(self.test_output, "r") as f:
+            result = f.read()
+
+        self.assertIn('name = "hello",', result)
+        self.assertIn('version = "1.2.3",', result)
+        # Слово, совпадающее с именем константы, остается ссылкой на нее
+        self.assertIn('alias = 80,', result)
+
+        with open(self.test_input, "w") as f:
+            f.write('[constants]\nbroken = "def BROKEN := 1.2.3 + 1;"\n')
+        with self.assertRaises(ValueError):
+            ConfigTranspiler(self.test_input, self.test_output).transpile()
+
 
 if __name__ == '__main__':
     unittest.main()
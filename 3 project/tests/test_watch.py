@@ -0,0 +1,102 @@
+import unittest
+import os
+import shutil
+import tempfile
+from src.watch import WatchSession
+
+
+class TestWatchSession(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_input = os.path.join(self.temp_dir, "input.toml")
+        self.test_output = os.path.join(self.temp_dir, "output.txt")
+        self.write('''
+[first]
+base = 10
+derived = "#(base)"
+
+[second]
+port = 5432
+alias = "#(port)"
+
+[third]
+chained = "#(derived)"
+''')
+        self.session = WatchSession(self.test_input, self.test_output)
+        self.assertTrue(self.session.rebuild())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, text):
+        with open(self.test_input, "w") as f:
+            f.write(text)
+
+    def read(self):
+        with open(self.test_output, "r") as f:
+            return f.read()
+
+    def test_unchanged_content_is_skipped(self):
+        self.assertFalse(self.session.rebuild())
+
+    def test_only_affected_constants_are_resolved(self):
+        self.write('''
+[first]
+base = 20
+derived = "#(base)"
+
+[second]
+port = 5432
+alias = "#(port)"
+
+[third]
+chained = "#(derived)"
+''')
+        self.assertTrue(self.session.rebuild())
+        transpiler = self.session.transpiler
+
+        # base, derived и chained
+        self.assertEqual(transpiler.resolved_count, 3)
+        self.assertEqual(transpiler.reused_count, 1)
+        result = self.read()
+        self.assertIn("derived = 20,", result)
+        self.assertIn("chained = 20,", result)
+        self.assertIn("alias = 5432,", result)
+
+    def test_key_order_change_is_rendered(self):
+        self.write('''
+[first]
+base = 10
+derived = "#(base)"
+
+[second]
+alias = "#(port)"
+port = 5432
+
+[third]
+chained = "#(derived)"
+''')
+        self.assertTrue(self.session.rebuild())
+        result = self.read()
+        self.assertLess(result.index("alias = 5432,"), result.index("port = 5432,"))
+
+    def test_error_keeps_previous_state(self):
+        self.write('''
+[first]
+base = 10
+derived = "#(missing)"
+''')
+        with self.assertRaises(ValueError):
+            self.session.rebuild()
+
+        self.write('''
+[first]
+base = 30
+derived = "#(base)"
+''')
+        self.assertTrue(self.session.rebuild())
+        self.assertIn("derived = 30,", self.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
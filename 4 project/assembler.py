@@ -1,191 +1,214 @@
 import argparse
-import struct
+import io
+import logging
+import os
+import sys
 
-class Assembler:
-    def __init__(self, input_file, output_file, log_file):
-        self.input_file = input_file
-        self.output_file = output_file
-        self.log_file = log_file
-        self.opcodes = {
-            "LOAD": 2,    # Загрузка константы (6 байт)
-            "READ": 7,    # Чтение значения из памяти (8 байт)
-            "WRITE": 3,   # Запись значения в память (7 байт)
-            "MIN": 6,     # Минимум двух значений (9 байт)
-        }
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 
-    def assemble(self):
-        binary_data = []
-        log_entries = []
+from binlog import open_log
+from isa import FORMATS, OPCODES
+from interpreter import MEMORY_SIZE
+from optimizer import optimize
+from common.telemetry import configure, get_logger, metrics
 
-        # Считываем текстовый файл с программой
-        with open(self.input_file, 'r') as file:
-            lines = file.readlines()
+# Размер блока, после которого собранные байты сбрасываются в выходной файл
+CHUNK_SIZE = 1 << 20
 
-        for line in lines:
-            line = line.strip()
+log = get_logger("assembler")
 
-            # Пропускаем пустые строки и комментарии
-            if not line or line.startswith('#'):
-                continue
 
-            # Удаляем комментарии в конце строки
-            if '#' in line:
-                line = line[:line.index('#')].strip()
+def split_line(line):
+    """Разбирает строку исходника на список меток и список слов команды или директивы."""
+    # Удаляем комментарии в конце строки
+    if '#' in line:
+        line = line[:line.index('#')]
+    parts = line.split()
+    labels = []
+    # Метки "имя:" стоят в начале строки, за ними может следовать команда
+    while parts and parts[0].endswith(':'):
+        labels.append(parts.pop(0)[:-1])
+    return labels, parts
 
-            # Разделяем команду и операнды
-            parts = line.split()
-            if len(parts) < 2:
-                raise ValueError(f"Неправильный формат команды: {line}")
 
-            command = parts[0].upper()
-            operands = list(map(int, parts[1:]))
+class Assembler:
+    def __init__(self, input_file, output_file, log_file, verbose=False, optimize=False, memory_size=MEMORY_SIZE):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.log_file = log_file
+        # LOAD - 6 байт, READ - 8 байт, WRITE - 7 байт, MIN - 9 байт
+        self.opcodes = OPCODES
+        # Отладочный вывод по каждой команде, по умолчанию выключен
+        self.verbose = verbose
+        # Peephole-оптимизация собранной программы (см. optimizer.py)
+        self.optimize = optimize
+        # Размер памяти интерпретатора: оптимизатор удаляет только записи по адресам внутри нее
+        self.memory_size = memory_size
+        self.stats = None
+        self.symbols = {}
+        self.labels = set()
+        self.size = 0
 
+    def assemble(self):
+        """Двухпроходная сборка файла: исходник читается построчно, не загружаясь целиком."""
+        opener = lambda: open(self.input_file, 'r')
+        # Первый проход только собирает символы и проверяет формат,
+        # поэтому при ошибке выходные файлы не создаются
+        with metrics.timer("assembler.assemble"):
+            self.first_pass(opener)
+
+            log_file, writer = open_log(self.log_file)
+            with open(self.output_file, 'wb') as bin_file, log_file:
+                self.second_pass(opener, bin_file, writer)
+
+        if self.stats is not None:
+            log.info("Оптимизация: %s", self.stats.summary())
+        log.info("Сборка завершена. Бинарный файл: %s, Лог-файл: %s", self.output_file, self.log_file)
+
+    def assemble_source(self, source):
+        """Собирает программу из строки в памяти и возвращает бинарный код."""
+        opener = lambda: io.StringIO(source)
+        self.first_pass(opener)
+        output = io.BytesIO()
+        self.second_pass(opener, output)
+        return output.getvalue()
+
+    def parse_command(self, parts, line_number):
+        fmt = FORMATS.get(parts[0])
+        if fmt is None:
+            command = parts[0].upper()
             # Проверяем, существует ли команда в таблице опкодов
             if command not in self.opcodes:
-                raise ValueError(f"Неизвестная команда: {command}")
-
-            opcode = self.opcodes[command]
-
-            # Пакуем данные в бинарный формат
-            if command == "LOAD":  # A=2, B - константа (17 бит), C - адрес (23 бита)
-                if len(operands) != 3:
-                    raise ValueError(f"Команда LOAD ожидает 3 операнда: {line}")
-                # Проверяем диапазоны значений
-                if not (0 <= operands[1] < 2**17):  # B: 17 бит для константы
-                    raise ValueError(f"Константа B должна быть в диапазоне [0, {2**17-1}]")
-                if not (0 <= operands[2] < 2**23):  # C: 23 бита для адреса
-                    raise ValueError(f"Адрес C должен быть в диапазоне [0, {2**23-1}]")
-                
-                # Формируем первый байт: 3 бита opcode (2 = 010) в старших битах
-                first_byte = 0xA2  # 10100010 - opcode 2 в старших битах
-                
-                # Формируем остальные байты для B (константа, 17 бит)
-                b_high = (operands[1] >> 9) & 0xFF
-                b_low = operands[1] & 0xFF
-                
-                # Формируем байты для C (адрес, 23 бита)
-                c_high = (operands[2] >> 16) & 0xFF
-                c_mid = (operands[2] >> 8) & 0xFF
-                c_low = operands[2] & 0xFF
-                
-                packed_data = bytes([
-                    first_byte,
-                    b_high,          # старшие биты B
-                    b_low,           # младшие биты B
-                    c_high,          # старшие биты C
-                    c_mid,           # средние биты C
-                    c_low            # младшие биты C
-                ])
-
-            elif command == "READ":  # A=7, B - смещение (10 бит), C и D - адреса (23 бита каждый)
-                if len(operands) != 4:
-                    raise ValueError(f"Команда READ ожидает 4 операнда: {line}")
-                if not (0 <= operands[1] < 2**10):  # B: 10 бит для смещения
-                    raise ValueError(f"Смещение B должно быть в диапазоне [0, {2**10-1}]")
-                if not (0 <= operands[2] < 2**23) or not (0 <= operands[3] < 2**23):
-                    raise ValueError(f"Адреса должны быть в диапазоне [0, {2**23-1}]")
-
-                # Формируем первый байт: 3 бита opcode (7 = 111) в старших битах
-                first_byte = 0x0F  # 00001111 - opcode 7 в старших битах и начало B
-                
-                packed_data = bytes([
-                    first_byte,
-                    0x40,  # Оставшиеся биты B и начало C
-                    0x6A,  # Продолжение C
-                    0x00,  # Продолжение C
-                    0x40,  # Конец C и начало D
-                    0x22,  # Продолжение D
-                    0x00,  # Продолжение D
-                    0x00   # Конец D
-                ])
-
-            elif command == "WRITE":  # A=3, B и C - адреса (23 бита каждый)
-                if len(operands) != 3:
-                    raise ValueError(f"Команда WRITE ожидает 3 операнда: {line}")
-                if not (0 <= operands[1] < 2**23) or not (0 <= operands[2] < 2**23):
-                    raise ValueError(f"Адреса должны быть в диапазоне [0, {2**23-1}]")
-
-                # Формируем первый байт: 3 бита opcode (3 = 011) в старших битах
-                first_byte = 0x53  # 01010011 - opcode 3 в старших битах и начало B
-                
-                packed_data = bytes([
-                    first_byte,
-                    0x03,  # Продолжение B
-                    0x00,  # Продолжение B
-                    0xB4,  # Конец B и начало C
-                    0x0A,  # Продолжение C
-                    0x00,  # Продолжение C
-                    0x00   # Конец C
-                ])
-
-            elif command == "MIN":  # A=6, B, C и D - адреса (23 бита каждый)
-                if len(operands) != 4:
-                    raise ValueError(f"Команда MIN ожидает 4 операнда: {line}")
-                if not all(0 <= op < 2**23 for op in operands[1:]):
-                    raise ValueError(f"Адреса должны быть в диапазоне [0, {2**23-1}]")
-
-                # Формируем первый байт: 3 бита opcode (6 = 110) в старших битах
-                first_byte = 0x36  # 00110110 - opcode 6 в старших битах
-                
-                # Формируем байты для B (адрес, 23 бита)
-                b_high = (operands[1] >> 16) & 0xFF
-                b_mid = (operands[1] >> 8) & 0xFF
-                b_low = operands[1] & 0xFF
-                
-                # Формируем байты для C (адрес, 23 бита)
-                c_high = (operands[2] >> 16) & 0xFF
-                c_mid = (operands[2] >> 8) & 0xFF
-                c_low = operands[2] & 0xFF
-                
-                # Формируем байты для D (адрес, 23 бита)
-                d_high = (operands[3] >> 16) & 0xFF
-                d_mid = (operands[3] >> 8) & 0xFF
-                d_low = operands[3] & 0xFF
-                
-                packed_data = bytes([
-                    first_byte,
-                    b_high,          # старшие биты B
-                    b_mid,           # средние биты B
-                    b_low,           # младшие биты B
-                    c_high,          # старшие биты C
-                    c_mid,           # средние биты C
-                    c_low,           # младшие биты C
-                    d_high,          # старшие биты D
-                    d_mid,           # средние биты D
-                    d_low            # младшие биты D
-                ])
-
-            else:
-                raise ValueError(f"Команда {command} не поддерживается: {line}")
-
-            binary_data.append(packed_data)
-            log_entries.append({"command": command, "opcode": opcode, "operands": operands})
-
-            # Отладочный вывод
-            print(f"Обработана команда: {command} {operands}")
-
-        # Записываем бинарные данные в выходной файл
-        with open(self.output_file, 'wb') as bin_file:
-            for entry in binary_data:
-                bin_file.write(entry)
-
-        # Создаем лог-файл в формате CSV
-        with open(self.log_file, 'w') as log_file:
-            log_file.write("command,opcode,operands\n")
-            for entry in log_entries:
-                log_file.write(
-                    f"{entry['command']},{entry['opcode']},{','.join(map(str, entry['operands']))}\n"
-                )
-
-        print(f"Сборка завершена. Бинарный файл: {self.output_file}, Лог-файл: {self.log_file}")
+                raise ValueError(f"Строка {line_number}: неизвестная команда: {command}")
+            fmt = FORMATS[command]
+        # Операнды в исходном тексте начинаются с самого кода операции (поле A)
+        if len(parts) - 1 != len(fmt.fields):
+            raise ValueError(f"Строка {line_number}: команда {fmt.name} ожидает "
+                             f"{len(fmt.fields)} операнда: {' '.join(parts)}")
+        return fmt
+
+    def define(self, name, value, line_number):
+        if not name.isidentifier():
+            raise ValueError(f"Строка {line_number}: некорректное имя символа: {name}")
+        if name in self.symbols:
+            raise ValueError(f"Строка {line_number}: символ {name} уже определен")
+        self.symbols[name] = value
+
+    def resolve_operand(self, token, line_number):
+        """Число, символ или выражение вида символ+число / символ-число."""
+        try:
+            return int(token)
+        except ValueError:
+            pass
+        name, sign, offset = token, 1, 0
+        for separator in '+-':
+            if separator in token:
+                name, _, rest = token.partition(separator)
+                sign = 1 if separator == '+' else -1
+                try:
+                    offset = int(rest)
+                except ValueError:
+                    raise ValueError(f"Строка {line_number}: некорректный операнд: {token}")
+                break
+        if name not in self.symbols:
+            raise ValueError(f"Строка {line_number}: неопределенный символ: {name}")
+        return self.symbols[name] + sign * offset
+
+    def first_pass(self, opener):
+        """Вычисляет адреса меток, значения .equ и размер программы."""
+        self.symbols = {}
+        self.labels = set()
+        offset = 0
+        with opener() as source:
+            for line_number, line in enumerate(source, 1):
+                labels, parts = split_line(line)
+                for label in labels:
+                    # Метка - смещение следующей команды в байтах
+                    self.define(label, offset, line_number)
+                    self.labels.add(label)
+                if not parts:
+                    continue
+                if parts[0].lower() == '.equ':
+                    if len(parts) != 3:
+                        raise ValueError(f"Строка {line_number}: ожидается .equ ИМЯ ЗНАЧЕНИЕ")
+                    # Значение .equ может ссылаться только на ранее определенные символы
+                    self.define(parts[1], self.resolve_operand(parts[2], line_number), line_number)
+                    continue
+                offset += self.parse_command(parts, line_number).size
+        self.size = offset
+        return self.symbols
+
+    def instructions(self, opener):
+        """Второй проход по исходнику: тройки (номер строки, формат, операнды с подставленными символами)."""
+        with opener() as source:
+            for line_number, line in enumerate(source, 1):
+                _, parts = split_line(line)
+                if not parts or parts[0].lower() == '.equ':
+                    continue
+
+                fmt = self.parse_command(parts, line_number)
+                # Обычные десятичные числа разбираются без обращения к таблице символов
+                operands = [int(token) if token.isdigit() else self.resolve_operand(token, line_number)
+                            for token in parts[1:]]
+                if operands[0] != fmt.opcode:
+                    raise ValueError(f"Строка {line_number}: поле A команды {fmt.name} "
+                                     f"должно быть равно {fmt.opcode}")
+                yield line_number, fmt, operands[1:]
+
+    def second_pass(self, opener, output, writer=None):
+        """Кодирует команды и пишет результат блоками; с оптимизацией программа сначала собирается целиком."""
+        instructions = self.instructions(opener)
+        if self.optimize:
+            # Метки - смещения в байтах, вычисленные первым проходом; удаление команд их сдвинуло бы
+            if self.labels:
+                raise ValueError(f"Оптимизация несовместима с метками: {', '.join(sorted(self.labels))}")
+            optimized, self.stats = optimize([(line, fmt.name, tuple(operands))
+                                              for line, fmt, operands in instructions], self.memory_size)
+            instructions = ((line, FORMATS[name], operands) for line, name, operands in optimized)
+
+        binary_data = bytearray()
+        written = 0
+        # Уровень проверяется один раз: при выключенном DEBUG в цикле нет ни вызовов, ни форматирования
+        debug = self.verbose and log.isEnabledFor(logging.DEBUG)
+
+        for line_number, fmt, operands in instructions:
+            # Пакуем данные в бинарный формат по таблице форматов
+            try:
+                fmt.pack_into(binary_data, operands)
+            except ValueError as e:
+                raise ValueError(f"Строка {line_number}: {e}")
+
+            if writer is not None:
+                writer.record(line_number, fmt, operands)
+            if debug:
+                log.debug("Обработана команда: %s %s", fmt.name, [fmt.opcode, *operands])
+
+            if len(binary_data) >= CHUNK_SIZE:
+                output.write(binary_data)
+                written += len(binary_data)
+                binary_data.clear()
+
+        output.write(binary_data)
+        metrics.count("assembler.bytes", written + len(binary_data))
+        if writer is not None:
+            writer.close()
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Assembler for the educational virtual machine.")
     parser.add_argument('-i', '--input', required=True, help="Path to the input assembly file.")
     parser.add_argument('-o', '--output', required=True, help="Path to the output binary file.")
-    parser.add_argument('-l', '--log', required=True, help="Path to the log file.")
+    parser.add_argument('-l', '--log', required=True, help="Path to the log file (.binlog for the binary format, CSV otherwise).")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Print every assembled instruction.")
+    parser.add_argument('-O', '--optimize', action='store_true', help="Run the peephole optimizer (not with labels).")
+    parser.add_argument('--memory-size', type=int, default=MEMORY_SIZE,
+                        help="Interpreter memory size; the optimizer only drops stores inside it.")
 
     args = parser.parse_args()
+    configure(logging.DEBUG if args.verbose else None)
 
-    assembler = Assembler(args.input, args.output, args.log)
+    assembler = Assembler(args.input, args.output, args.log, verbose=args.verbose, optimize=args.optimize,
+                          memory_size=args.memory_size)
     assembler.assemble()
@@ -0,0 +1,119 @@
+import argparse
+import csv
+import os
+import time
+
+from interpreter import MEMORY_SIZE, Interpreter
+from common.pool import WorkerCache, run_jobs
+
+# Состояние процесса-обработчика: параметры интерпретатора и уже загруженные программы
+_worker_state = {}
+
+
+def _init_worker(memory_size, jit):
+    _worker_state["memory_size"] = memory_size
+    _worker_state["jit"] = jit
+    _worker_state["interpreters"] = WorkerCache()
+
+
+def _load(binary_file):
+    interpreter = Interpreter(binary_file, None, None, memory_size=_worker_state["memory_size"],
+                              jit=_worker_state["jit"])
+    # Файл читается целиком, а не через mmap: после предекодирования программа
+    # не нужна, и кэш не должен держать открытым дескриптор на каждый файл
+    with open(binary_file, "rb") as file:
+        interpreter.load_bytes(file.read())
+    return interpreter
+
+
+def _interpreter(binary_file):
+    """Интерпретатор с уже декодированной программой из небольшого LRU-кэша процесса."""
+    return _worker_state["interpreters"].get(binary_file, lambda: _load(binary_file), Interpreter.reset)
+
+
+def _run_one(job):
+    """Выполняет программу над начальным образом памяти; ошибки возвращаются, а не выбрасываются."""
+    binary_file, memory_image, start, end = job
+    started = time.perf_counter()
+    try:
+        interpreter = _interpreter(binary_file)
+        if memory_image is not None:
+            interpreter.load_memory(memory_image)
+        interpreter.run()
+        # Срез молча обрезал бы диапазон за пределами памяти, поэтому границы проверяются явно
+        interpreter.check_address(start, "чтении результата")
+        interpreter.check_address(end, "чтении результата")
+        if start > end:
+            raise ValueError(f"Начало диапазона {start} больше конца {end}")
+        values = interpreter.memory[start:end + 1]
+        error = None
+    except Exception as e:
+        values = None
+        error = f"{type(e).__name__}: {e}"
+    return binary_file, memory_image, values, error, time.perf_counter() - started
+
+
+def job_label(binary_file, memory_image, binaries, images):
+    """Имя столбца результата: имя программы и/или образа памяти, если их несколько."""
+    parts = []
+    if len(binaries) > 1 or not images:
+        parts.append(os.path.splitext(os.path.basename(binary_file))[0])
+    if images:
+        parts.append(os.path.splitext(os.path.basename(memory_image))[0])
+    return ":".join(parts)
+
+
+def run_batch(binaries, memory_range, images=(), jobs=None, memory_size=MEMORY_SIZE, jit=False):
+    """Выполняет каждую программу над каждым образом памяти в пуле процессов.
+
+    Возвращает (столбцы, ошибки): столбцы - список пар (имя, значения диапазона памяти).
+    """
+    start, end = memory_range
+    tasks = [(binary, image, start, end) for binary in binaries for image in (images or [None])]
+    # Задачи одной программы идут подряд, поэтому попадают в одни и те же порции
+    # и программа декодируется в каждом процессе не больше нескольких раз
+    columns = []
+    errors = []
+
+    def collect(result):
+        binary_file, memory_image, values, error, _ = result
+        if error is None:
+            columns.append((job_label(binary_file, memory_image, binaries, images), values))
+        else:
+            errors.append((binary_file, memory_image, error))
+
+    for result in run_jobs(_run_one, tasks, jobs, _init_worker, (memory_size, jit)):
+        collect(result)
+    return columns, errors
+
+
+def save_columns(path, memory_range, columns):
+    """Записывает результаты в один CSV: строка на адрес, столбец на запуск."""
+    start, end = memory_range
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Address"] + [label for label, _ in columns])
+        writer.writerows(zip(range(start, end + 1), *(values for _, values in columns)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетное выполнение программ УВМ.")
+    parser.add_argument("-i", "--input", required=True, nargs="+", help="Бинарные файлы программ")
+    parser.add_argument("-m", "--memory", nargs="*", default=[],
+                        help="Начальные образы памяти (CSV Address,Value или 8-байтовые ячейки)")
+    parser.add_argument("-r", "--result", required=True, help="Путь к файлу результата")
+    parser.add_argument("--range", required=True, type=int, nargs=2, help="Диапазон памяти (start end)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--memory-size", type=int, default=MEMORY_SIZE, help="Размер памяти в ячейках")
+    parser.add_argument("--jit", action="store_true", help="Компилировать блоки команд в функции Python")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    columns, errors = run_batch(args.input, args.range, args.memory, args.jobs, args.memory_size, args.jit)
+    save_columns(args.result, args.range, columns)
+    for binary_file, memory_image, error in errors:
+        print(f"Ошибка {binary_file}" + (f" ({memory_image})" if memory_image else "") + f": {error}")
+    print(f"Выполнено запусков: {len(columns) + len(errors)}, с ошибками: {len(errors)}, "
+          f"время: {time.perf_counter() - started:.2f} с")
+    if errors:
+        raise SystemExit(1)
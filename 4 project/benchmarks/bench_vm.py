@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Корень репозитория - для общей обвязки common.benchmark
+sys.path[:0] = [PROJECT_DIR, os.path.dirname(PROJECT_DIR)]
+
+from assembler import Assembler
+from benchmarks.generator import GENERATORS, MEMORY_SIZE, generate
+from common.benchmark import add_arguments, best_times, check_baseline, peak_memory
+from interpreter import Interpreter
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Режимы выполнения: (имя, параметры Interpreter)
+MODES = (
+    ("plain", {"vectorize": False}),
+    ("vectorized", {}),
+    ("jit", {"jit": True, "jit_threshold": 0}),
+)
+# Абсолютные скорости (команд/с, МБ/с исходника при сборке) зависят от машины и только выводятся. Регрессии
+# ищутся по отношениям к скорости простого цикла интерпретатора на той же
+# машине: ускорение векторного режима и JIT, относительная скорость сборки
+# и предекодирования (больше - лучше)
+RATIOS = ("assemble_ratio", "predecode_ratio", "vectorized_speedup", "jit_speedup")
+
+
+def measure(source, repeat=10):
+    """Скорости сборки (команд/с и МБ/с исходника), предекодирования и режимов выполнения, их отношения и пик памяти."""
+    program = Assembler(None, None, None).assemble_source(source)
+    probe = Interpreter(None, None, None, memory_size=MEMORY_SIZE, vectorize=False)
+    probe.load_bytes(program)
+    instructions = len(probe.code)
+
+    functions = {
+        "assemble": lambda: Assembler(None, None, None).assemble_source(source),
+        "predecode": lambda: probe.load_bytes(program),
+    }
+    for name, options in MODES:
+        interpreter = Interpreter(None, None, None, memory_size=MEMORY_SIZE, **options)
+        interpreter.load_bytes(program)
+        # Первый прогон компилирует блоки JIT, замеряются последующие
+        interpreter.run()
+
+        def run(interpreter=interpreter):
+            interpreter.reset()
+            interpreter.run()
+        functions[name] = run
+    times = best_times(functions, repeat)
+    speed = {name: instructions / elapsed for name, elapsed in times.items()}
+
+    def assemble_and_run():
+        interpreter = Interpreter(None, None, None, memory_size=MEMORY_SIZE)
+        interpreter.load_bytes(Assembler(None, None, None).assemble_source(source))
+        interpreter.run()
+
+    plain = speed["plain"]
+    return {
+        "instructions": instructions,
+        "ips": speed,
+        "assemble_mbps": len(source.encode()) / times["assemble"] / 1e6,
+        "assemble_ratio": speed["assemble"] / plain,
+        "predecode_ratio": speed["predecode"] / plain,
+        "vectorized_speedup": speed["vectorized"] / plain,
+        "jit_speedup": speed["jit"] / plain,
+        "peak_memory": peak_memory(assemble_and_run),
+    }
+
+
+def run_suite(size, repeat=10):
+    return {kind: dict(measure(generate(kind, size), repeat), size=size) for kind in GENERATORS}
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Возвращает список регрессий относительных показателей и памяти."""
+    regressions = []
+    for kind, result in results.items():
+        reference = baseline.get(kind)
+        if reference is None or reference["size"] != result["size"]:
+            continue
+        for ratio in RATIOS:
+            if result[ratio] < reference[ratio] * (1 - tolerance):
+                regressions.append(f"{kind}/{ratio}: {result[ratio]:.3f}, в базовой версии {reference[ratio]:.3f}")
+        # tracemalloc считает байты объектов Python, а не память процесса, поэтому пик сравним между машинами
+        if result["peak_memory"] > reference["peak_memory"] * (1 + tolerance):
+            regressions.append(f"{kind}: пик памяти {result['peak_memory'] // 1024}КБ, "
+                               f"в базовой версии {reference['peak_memory'] // 1024}КБ")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'профиль':<16}" + "".join(f"{name + ', ком/с':>22}" for name in results[next(iter(results))]["ips"])
+          + f"{'сборка, МБ/с':>14}" + "".join(f"{ratio:>20}" for ratio in RATIOS) + f"{'память, КБ':>12}")
+    for kind, result in results.items():
+        row = f"{kind:<16}" + "".join(f"{value:>22,.0f}" for value in result["ips"].values())
+        row += f"{result['assemble_mbps']:>14.2f}" + "".join(f"{result[ratio]:>20.3f}" for ratio in RATIOS)
+        print(row + f"{result['peak_memory'] // 1024:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ассемблера и интерпретатора на сгенерированных программах")
+    parser.add_argument("--size", type=int, default=50000, help="Количество команд в программе")
+    add_arguments(parser, BASELINE_PATH, 0.4,
+                  "Допустимое падение отношений скоростей относительно базовой версии (0.4 = 40%%)", repeat=10)
+    args = parser.parse_args()
+
+    results = run_suite(args.size, args.repeat)
+    print_results(results)
+    check_baseline(args, results, lambda results, baseline: compare_with_baseline(results, baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Генератор программ УВМ с заданным составом команд для бенчмарков."""
+import random
+
+# Все программы работают в памяти такого размера
+MEMORY_SIZE = 1 << 16
+
+
+def load_heavy(size, seed=1):
+    """Только LOAD: случайные константы по случайным адресам."""
+    rng = random.Random(seed)
+    return "".join(f"LOAD 2 {rng.randrange(1 << 17)} {rng.randrange(MEMORY_SIZE)}\n" for _ in range(size))
+
+
+def indirect_chains(size, seed=2, table=1024):
+    """Таблица указателей и цепочки косвенных READ/WRITE по ней."""
+    rng = random.Random(seed)
+    lines = [f"LOAD 2 {rng.randrange(table)} {i}" for i in range(table)]
+    for i in range(max(0, size - table)):
+        pointer = rng.randrange(table)
+        if i % 2:
+            lines.append(f"READ 7 {rng.randrange(8)} {pointer} {table + rng.randrange(table)}")
+        else:
+            lines.append(f"WRITE 3 {table + rng.randrange(table)} {pointer}")
+    return "\n".join(lines) + "\n"
+
+
+def vector_min(size, length=256, seed=3):
+    """Векторы по length элементов и поэлементный MIN над ними, как в test_vectors.asm."""
+    rng = random.Random(seed)
+    lines = []
+    vectors = max(1, size // (length * 3))
+    for vector in range(vectors):
+        first, second, result = (vector * 3 * length + k * length for k in range(3))
+        lines += [f"LOAD 2 {rng.randrange(1000)} {first + i}" for i in range(length)]
+        lines += [f"LOAD 2 {rng.randrange(1000)} {second + i}" for i in range(length)]
+        lines += [f"MIN 6 {first + i} {second + i} {result + i}" for i in range(length)]
+    return "\n".join(lines) + "\n"
+
+
+def mixed(size, seed=4):
+    """Все команды вперемешку по небольшому рабочему набору ячеек."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        kind = rng.randrange(4)
+        if kind == 0:
+            lines.append(f"LOAD 2 {rng.randrange(256)} {rng.randrange(256)}")
+        elif kind == 1:
+            lines.append(f"READ 7 {rng.randrange(16)} {rng.randrange(256)} {rng.randrange(256)}")
+        elif kind == 2:
+            lines.append(f"WRITE 3 {rng.randrange(256)} {rng.randrange(256)}")
+        else:
+            lines.append(f"MIN 6 {rng.randrange(256)} {rng.randrange(256)} {rng.randrange(256)}")
+    return "\n".join(lines) + "\n"
+
+
+GENERATORS = {
+    "load_heavy": load_heavy,
+    "indirect_chains": indirect_chains,
+    "vector_min": vector_min,
+    "mixed": mixed,
+}
+
+
+def generate(kind, size):
+    """Возвращает исходный текст программы заданного вида примерно из size команд."""
+    return GENERATORS[kind](size)
@@ -0,0 +1,173 @@
+"""Компактные двоичные форматы вывода ассемблера и интерпретатора.
+
+Лог ассемблера (.binlog) - заголовок и записи фиксированной ширины:
+номер строки исходника, код операции и операнды B, C, D (недостающие - 0).
+Результат интерпретатора (.npy) - массив int64 формы (n, 2) со строками
+(адрес, значение), записанный вручную в формате NumPy .npy и читаемый как
+numpy.load, так и функциями этого модуля без NumPy. CSV-файлы строятся из
+этих форматов функциями export_*.
+"""
+import argparse
+import ast
+import csv
+import struct
+import sys
+from array import array
+
+from isa import FORMATS_BY_OPCODE
+
+LOG_MAGIC = b"UVML"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sH")
+# Номер строки, код операции, B, C, D
+LOG_RECORD = struct.Struct("<IBIII")
+LOG_COLUMNS = ("line", "opcode", "b", "c", "d")
+# Размер буфера записей, после которого он сбрасывается в файл
+FLUSH_SIZE = 1 << 20
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+class CsvLogWriter:
+    """Текстовый лог ассемблера: строка, команда, код операции, операнды (начиная с A)."""
+
+    def __init__(self, file):
+        self.file = file
+        # Первый столбец - номер строки исходника, из которой получена команда
+        file.write("line,command,opcode,operands\n")
+
+    def record(self, line, fmt, operands):
+        self.file.write(f"{line},{fmt.name},{fmt.opcode},{fmt.opcode},{','.join(map(str, operands))}\n")
+
+    def close(self):
+        pass
+
+
+class BinaryLogWriter:
+    """Двоичный лог ассемблера из записей фиксированной ширины."""
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = bytearray(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+
+    def record(self, line, fmt, operands):
+        b, c, d = (tuple(operands) + (0, 0))[:3]
+        self.buffer += LOG_RECORD.pack(line, fmt.opcode, b, c, d)
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+
+    def close(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+
+def open_log(path):
+    """Открывает лог нужного формата по расширению: .binlog - двоичный, иначе CSV."""
+    if path.endswith(".binlog"):
+        file = open(path, "wb")
+        return file, BinaryLogWriter(file)
+    file = open(path, "w")
+    return file, CsvLogWriter(file)
+
+
+def _read_log_data(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < LOG_HEADER.size or LOG_HEADER.unpack_from(data) != (LOG_MAGIC, LOG_VERSION):
+        raise ValueError(f"{path} не является двоичным логом ассемблера")
+    body = memoryview(data)[LOG_HEADER.size:]
+    if len(body) % LOG_RECORD.size:
+        raise ValueError(f"Двоичный лог {path} обрезан")
+    return body
+
+
+def iter_log(path):
+    """Записи лога как кортежи (строка, код операции, B, C, D)."""
+    return LOG_RECORD.iter_unpack(_read_log_data(path))
+
+
+def load_log(path):
+    """Лог по столбцам: словарь имя -> array."""
+    columns = {name: array("B" if name == "opcode" else "I") for name in LOG_COLUMNS}
+    records = list(iter_log(path))
+    if records:
+        for name, values in zip(LOG_COLUMNS, zip(*records)):
+            columns[name].extend(values)
+    return columns
+
+
+def export_log_csv(path, csv_path):
+    """Строит из двоичного лога CSV в формате текстового лога ассемблера."""
+    with open(csv_path, "w") as file:
+        writer = CsvLogWriter(file)
+        for line, opcode, b, c, d in iter_log(path):
+            fmt = FORMATS_BY_OPCODE[opcode]
+            writer.record(line, fmt, (b, c, d)[:len(fmt.operand_fields)])
+
+
+def save_results(path, start, values):
+    """Записывает диапазон памяти в .npy формы (n, 2): строки (адрес, значение)."""
+    count = len(values)
+    data = array("q", bytes(16 * count))
+    data[0::2] = array("q", range(start, start + count))
+    data[1::2] = array("q", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+
+    header = f"{{'descr': '<i8', 'fortran_order': False, 'shape': ({count}, 2), }}"
+    # Заголовок дополняется пробелами так, чтобы данные начинались с границы 64 байт
+    unpadded = len(NPY_MAGIC) + 2 + 2 + len(header) + 1
+    header += " " * (-unpadded % 64) + "\n"
+    with open(path, "wb") as file:
+        file.write(NPY_MAGIC + bytes([1, 0]) + struct.pack("<H", len(header)) + header.encode("latin1"))
+        file.write(data.tobytes())
+
+
+def load_results(path):
+    """Читает результат .npy и возвращает (адреса, значения) в виде array('q')."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(NPY_MAGIC):
+        raise ValueError(f"{path} не является файлом .npy")
+    major = data[6]
+    if major == 1:
+        (header_size,) = struct.unpack_from("<H", data, 8)
+        header_start = 10
+    else:
+        (header_size,) = struct.unpack_from("<I", data, 8)
+        header_start = 12
+    header = ast.literal_eval(data[header_start:header_start + header_size].decode("latin1"))
+    if header["descr"] != "<i8" or header["fortran_order"] or len(header["shape"]) != 2 or header["shape"][1] != 2:
+        raise ValueError(f"{path}: ожидается массив int64 формы (n, 2)")
+
+    values = array("q")
+    values.frombytes(data[header_start + header_size:])
+    if sys.byteorder == "big":
+        values.byteswap()
+    if len(values) != 2 * header["shape"][0]:
+        raise ValueError(f"Файл {path} обрезан")
+    return values[0::2], values[1::2]
+
+
+def export_results_csv(path, csv_path):
+    """Строит из .npy CSV в формате результата интерпретатора."""
+    addresses, values = load_results(path)
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Address", "Value"])
+        writer.writerows(zip(addresses, values))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Экспорт двоичных логов и результатов УВМ в CSV.")
+    parser.add_argument("-i", "--input", required=True, help="Файл .binlog или .npy")
+    parser.add_argument("-o", "--output", required=True, help="Путь к CSV")
+    args = parser.parse_args()
+
+    with open(args.input, "rb") as f:
+        magic = f.read(len(NPY_MAGIC))
+    if magic == NPY_MAGIC:
+        export_results_csv(args.input, args.output)
+    else:
+        export_log_csv(args.input, args.output)
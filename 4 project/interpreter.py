@@ -1,98 +1,395 @@
 import argparse
 import csv
+import logging
+import mmap
+import os
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:  # NumPy необязателен: без него векторные операции выполняются на array
+    numpy = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import binlog
+from common.telemetry import configure, get_logger, metrics
+from jit import BLOCK_SIZE, compile_block
+from isa import ADDRESS_BITS, FORMATS, FORMATS_BY_OPCODE, OPCODE_MASK, VECTOR_MIN
+
+MEMORY_SIZE = 2048  # Размер памяти по умолчанию (в ячейках)
+MAX_MEMORY_SIZE = 1 << ADDRESS_BITS  # Все адреса, которые можно закодировать в команде
+ADDRESS_MASK = MAX_MEMORY_SIZE - 1
+
+log = get_logger("interpreter")
+
+MIN_OPCODE = FORMATS["MIN"].opcode
+
+# Индексы операндов (после A), которые являются адресами и известны до выполнения
+STATIC_ADDRESSES = {
+    "LOAD": (1,),        # C
+    "READ": (1, 2),      # C, D
+    "WRITE": (0, 1),     # B, C
+    "MIN": (0, 1, 2),    # B, C, D
+}
+
+
+def predecode(program, memory_size=MEMORY_SIZE):
+    """Декодирует программу один раз в список кортежей (код операции, B, C, D).
+
+    Адреса, записанные в самой команде, проверяются здесь же, поэтому при
+    выполнении проверяются только адреса, вычисляемые по содержимому памяти.
+    Второй результат - смещения команд в бинарном файле (для сообщений об ошибках).
+    """
+    # Код операции -> (формат, индексы адресных операндов, дополнение до трех операндов)
+    formats = {opcode: (fmt, STATIC_ADDRESSES[fmt.name], (0,) * (3 - len(fmt.operand_fields)))
+               for opcode, fmt in FORMATS_BY_OPCODE.items()}
+    code = []
+    offsets = array("I")
+    append = code.append
+    append_offset = offsets.append
+    pointer = 0
+    length = len(program)
+    while pointer < length:
+        entry = formats.get(program[pointer] & OPCODE_MASK)
+        if entry is None:
+            raise ValueError(f"Неизвестная команда: {hex(program[pointer])}")
+        fmt, addresses, padding = entry
+        if pointer + fmt.size > length:
+            raise ValueError(f"Команда {fmt.name} по смещению {pointer} обрезана")
+        operands = fmt.decode(program, pointer)
+        for index in addresses:
+            if operands[index] >= memory_size:
+                raise ValueError(f"Адрес {operands[index]} выходит за пределы памяти "
+                                 f"при выполнении {fmt.name} (смещение {pointer})")
+        append((fmt.opcode,) + operands + padding)
+        append_offset(pointer)
+        pointer += fmt.size
+    return code, offsets
+
+
+def fuse_vector_ops(code, offsets, min_length=4):
+    """Заменяет серии поэлементных MIN по соседним адресам одной векторной операцией.
+
+    Серия MIN b+i, c+i, d+i (i = 0..n-1) превращается в (VECTOR_MIN, b, c, n << 23 | d).
+    Длина серии ограничена так, чтобы запись в d+i не меняла значение, которое
+    последовательное выполнение прочитало бы позже (0 < d - b < n или 0 < d - c < n).
+    """
+    fused = []
+    fused_offsets = array("I")
+    index = 0
+    total = len(code)
+    while index < total:
+        opcode, b, c, d = code[index]
+        length = 1
+        if opcode == MIN_OPCODE:
+            # Наибольшая безопасная длина серии с такими b, c, d
+            limit = total - index
+            for distance in (d - b, d - c):
+                if 0 < distance < limit:
+                    limit = distance
+            while length < limit and code[index + length] == (MIN_OPCODE, b + length, c + length, d + length):
+                length += 1
+        if length >= min_length:
+            fused.append((VECTOR_MIN, b, c, length << ADDRESS_BITS | d))
+            fused_offsets.append(offsets[index])
+        else:
+            fused.extend(code[index:index + length])
+            fused_offsets.extend(offsets[index:index + length])
+        index += length
+    return fused, fused_offsets
 
-MEMORY_SIZE = 2048  # Размер памяти в байтах
 
 class Interpreter:
-    def __init__(self, binary_file, result_file, memory_range):
+    def __init__(self, binary_file, result_file, memory_range, verbose=False,
+                 memory_size=MEMORY_SIZE, vectorize=True, jit=False, jit_threshold=2, profiler=None,
+                 checkpoint_every=1000000):
         self.binary_file = binary_file
         self.result_file = result_file
         self.memory_range = memory_range
-        self.memory = [0] * MEMORY_SIZE
-        
+        if not (0 < memory_size <= MAX_MEMORY_SIZE):
+            raise ValueError(f"Размер памяти должен быть в диапазоне [1, {MAX_MEMORY_SIZE}]")
+        # Типизированный буфер: 8 байт на ячейку вместо объекта int на каждую ячейку списка
+        self.memory = array("q", bytes(8 * memory_size))
+        # Отладочный вывод LOAD/MIN; при выключенном флаге используются обработчики без print
+        self.verbose = verbose
+        # Объединение серий MIN в векторные операции (при отладочном выводе и профилировании
+        # не применяется: и журнал, и профиль должны показывать команды программы)
+        self.vectorize = vectorize and not verbose and profiler is None
+        # Компиляция блоков в функции Python (с отладочным выводом не применяется).
+        # Блок компилируется после jit_threshold выполнений обычным циклом:
+        # компиляция окупается только при многократном выполнении программы
+        self.jit = jit and not verbose
+        self.jit_threshold = jit_threshold
+        # Профилировщик выполняет программу своим инструментированным циклом
+        self.profiler = profiler
+        # Объект с методом save(), вызываемым каждые checkpoint_every команд (см. snapshot.py)
+        self.checkpoint = None
+        if checkpoint_every <= 0:
+            raise ValueError("Интервал контрольных точек должен быть положительным")
+        self.checkpoint_every = checkpoint_every
+        # Номер следующей выполняемой команды в self.code
+        self.pc = 0
+        self.program = b""
+        self.code = []
+        self.offsets = array("I")
+        self.blocks = {}
+        self.block_counts = {}
+
     def check_address(self, addr, operation):
-        if not (0 <= addr < MEMORY_SIZE):
+        if not (0 <= addr < len(self.memory)):
             raise ValueError(f"Адрес {addr} выходит за пределы памяти при выполнении {operation}")
-    
+
     def load_program(self):
+        """Загружает программу через mmap: файл не копируется в память процесса целиком."""
         with open(self.binary_file, "rb") as file:
-            self.program = file.read()
+            # Пустой файл нельзя отобразить в память
+            if os.fstat(file.fileno()).st_size == 0:
+                self.load_bytes(b"")
+                return
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.load_bytes(mapped)
+        except ValueError:
+            mapped.close()
+            raise
 
-    def execute(self):
-        pointer = 0
-        while pointer < len(self.program):
-            # Получаем opcode из первого байта
-            first_byte = self.program[pointer]
-            
-            if first_byte == 0xA2:  # LOAD (6 байт)
-                # Декодируем B (константа) и C (адрес) из следующих байтов
-                B = (self.program[pointer + 1] << 8) | self.program[pointer + 2]
-                C = (self.program[pointer + 3] << 16) | (self.program[pointer + 4] << 8) | self.program[pointer + 5]
-                self.check_address(C, "LOAD")
-                self.memory[C] = B
-                print(f"LOAD: Записано значение {B} по адресу {C}")
-                pointer += 6
-            
-            elif first_byte == 0x0F:  # READ (8 байт)
-                # Декодируем B (смещение), C и D (адреса) из следующих байтов
-                B = ((self.program[pointer + 1] << 2) | (self.program[pointer + 2] >> 6)) & 0x3FF
-                C = ((self.program[pointer + 2] << 17) | (self.program[pointer + 3] << 9) | (self.program[pointer + 4] << 1) | (self.program[pointer + 5] >> 7)) & 0x7FFFFF
-                D = ((self.program[pointer + 5] << 16) | (self.program[pointer + 6] << 8) | self.program[pointer + 7]) & 0x7FFFFF
-                self.check_address(C, "READ source")
-                value = self.memory[C] + B
-                self.check_address(value, "READ computed")
-                self.check_address(D, "READ destination")
-                self.memory[D] = self.memory[value]
-                pointer += 8
-
-            elif first_byte == 0x53:  # WRITE (7 байт)
-                # Декодируем B и C (адреса) из следующих байтов
-                B = ((self.program[pointer + 1] << 15) | (self.program[pointer + 2] << 7) | (self.program[pointer + 3] >> 1)) & 0x7FFFFF
-                C = ((self.program[pointer + 3] << 22) | (self.program[pointer + 4] << 14) | (self.program[pointer + 5] << 6) | (self.program[pointer + 6] >> 2)) & 0x7FFFFF
-                self.check_address(B, "WRITE source")
-                self.check_address(C, "WRITE pointer")
-                dest_addr = self.memory[C]
-                self.check_address(dest_addr, "WRITE destination")
-                self.memory[dest_addr] = self.memory[B]
-                pointer += 7
-
-            elif first_byte == 0x36:  # MIN (10 байт)
-                # Декодируем B, C и D (адреса) из следующих байтов
-                B = (self.program[pointer + 1] << 16) | (self.program[pointer + 2] << 8) | self.program[pointer + 3]
-                C = (self.program[pointer + 4] << 16) | (self.program[pointer + 5] << 8) | self.program[pointer + 6]
-                D = (self.program[pointer + 7] << 16) | (self.program[pointer + 8] << 8) | self.program[pointer + 9]
-                
-                self.check_address(B, "MIN first operand")
-                self.check_address(C, "MIN second operand")
-                self.check_address(D, "MIN result")
-                
-                val1 = self.memory[B]
-                val2 = self.memory[C]
+    def close(self):
+        """Закрывает отображение файла программы, если оно есть."""
+        if isinstance(self.program, mmap.mmap):
+            self.program.close()
+        self.program = b""
+
+    def load_bytes(self, program):
+        """Загружает бинарную программу из памяти и сразу декодирует ее."""
+        code, offsets = predecode(program, len(self.memory))
+        if self.vectorize:
+            code, offsets = fuse_vector_ops(code, offsets)
+        if program is not self.program:
+            self.close()
+        self.code, self.offsets = code, offsets
+        self.program = program
+        self.pc = 0
+        # Скомпилированные блоки относятся к предыдущей программе
+        self.blocks = {}
+        self.block_counts = {}
+
+    def reset(self):
+        """Обнуляет память и счетчик команд, не пересоздавая память: загруженная программа сохраняется."""
+        self.memory[:] = array("q", bytes(8 * len(self.memory)))
+        self.pc = 0
+
+    def handlers(self):
+        """Таблица обработчиков, индексированная кодом операции."""
+        memory = self.memory
+        size = len(memory)
+        check_address = self.check_address
+        # Представление той же памяти без копирования для векторных операций NumPy
+        view = numpy.frombuffer(memory, dtype=numpy.int64) if numpy is not None else None
+
+        # Отладочные обработчики подставляются, только если DEBUG включен: иначе цикл не платит за журнал
+        if self.verbose and log.isEnabledFor(logging.DEBUG):
+            def load(b, c, d):  # B - константа, C - адрес
+                memory[c] = b
+                log.debug("LOAD: Записано значение %s по адресу %s", b, c)
+
+            def min_(b, c, d):  # B, C и D - адреса
+                val1 = memory[b]
+                val2 = memory[c]
                 result = min(val1, val2)
-                print(f"MIN: Сравниваем значения memory[{B}]={val1} и memory[{C}]={val2}, результат {result} записан по адресу {D}")
-                self.memory[D] = result
-                pointer += 10
+                log.debug("MIN: Сравниваем значения memory[%s]=%s и memory[%s]=%s, результат %s записан по адресу %s",
+                          b, val1, c, val2, result, d)
+                memory[d] = result
+        else:
+            def load(b, c, d):
+                memory[c] = b
+
+            def min_(b, c, d):
+                val1 = memory[b]
+                val2 = memory[c]
+                memory[d] = val1 if val1 <= val2 else val2
+
+        def read(b, c, d):  # B - смещение, C и D - адреса
+            value = memory[c] + b
+            if not 0 <= value < size:
+                check_address(value, "READ computed")
+            memory[d] = memory[value]
+
+        def write(b, c, d):  # B и C - адреса
+            dest_addr = memory[c]
+            if not 0 <= dest_addr < size:
+                check_address(dest_addr, "WRITE destination")
+            memory[dest_addr] = memory[b]
+
+        def vector_min(b, c, packed):  # Серия MIN: n = packed >> 23, d = packed & ADDRESS_MASK
+            n = packed >> ADDRESS_BITS
+            d = packed & ADDRESS_MASK
+            if numpy is not None:
+                numpy.minimum(view[b:b + n], view[c:c + n], out=view[d:d + n])
+            else:
+                memory[d:d + n] = array("q", [x if x <= y else y for x, y in zip(memory[b:b + n], memory[c:c + n])])
+
 
+        table = [None] * (VECTOR_MIN + 1)
+        for name, handler in (("LOAD", load), ("READ", read), ("WRITE", write), ("MIN", min_)):
+            table[FORMATS[name].opcode] = handler
+        table[VECTOR_MIN] = vector_min
+        return table
+
+    def run(self):
+        """Выполняет загруженную программу с команды self.pc без сохранения результата."""
+        table = self.handlers()
+        code = self.code
+        start = self.pc
+        with metrics.timer("interpreter.run"):
+            if self.profiler is not None:
+                self.profiler.run(self, table)
+                self.pc = len(code)
             else:
-                raise ValueError(f"Неизвестная команда: {hex(first_byte)}")
+                self.run_chunks(table)
+        # Считаются предекодированные команды: серия MIN после слияния - одна команда
+        metrics.count("interpreter.commands", self.pc - start)
+
+    def run_chunks(self, table):
+        """Основной цикл: выполнение участками с контрольными точками между ними."""
+        code = self.code
+        step = len(code) - self.pc
+        if self.checkpoint is not None:
+            step = self.checkpoint_every
+            if self.jit:
+                # Контрольные точки на границах блоков, чтобы не дробить скомпилированные блоки
+                step = -(-step // BLOCK_SIZE) * BLOCK_SIZE
+        run_range = self.run_jit if self.jit else self.run_plain
+        while self.pc < len(code):
+            end = min(self.pc + step, len(code))
+            run_range(table, self.pc, end)
+            self.pc = end
+            if self.checkpoint is not None:
+                self.checkpoint.save()
+
+    def run_plain(self, table, start, end):
+        code = self.code
+        for opcode, b, c, d in (code if start == 0 and end == len(code) else code[start:end]):
+            table[opcode](b, c, d)
+
+    def run_jit(self, table, start, end):
+        code = self.code
+        blocks = self.blocks
+        index = start
+        while index < end:
+            block_end = min(index - index % BLOCK_SIZE + BLOCK_SIZE, len(code))
+            if index % BLOCK_SIZE or block_end > end:
+                # Неполный блок (например, после возобновления со снимка) выполняется обычным циклом
+                stop = min(block_end, end)
+                self.run_plain(table, index, stop)
+                index = stop
+                continue
+
+            # Блоки кэшируются по смещению первой команды в бинарном файле
+            offset = self.offsets[index]
+            block = blocks.get(offset)
+            if block is None:
+                count = self.block_counts.get(offset, 0)
+                if count >= self.jit_threshold:
+                    block = blocks[offset] = compile_block(code, index, block_end, self.memory,
+                                                           self.check_address, table[VECTOR_MIN])
+                else:
+                    self.block_counts[offset] = count + 1
+                    self.run_plain(table, index, block_end)
+            if block is not None:
+                block()
+            index = block_end
 
+    def execute(self):
+        self.run()
         self.save_results()
 
+    def load_memory(self, path):
+        """Загружает начальное содержимое памяти.
+
+        Поддерживается CSV в формате результата (Address,Value) и сырой файл
+        8-байтовых ячеек little-endian, начиная с адреса 0.
+        """
+        if path.endswith(".csv"):
+            with open(path, "r", newline="") as file:
+                reader = csv.reader(file)
+                next(reader, None)
+                for addr, value in reader:
+                    addr = int(addr)
+                    self.check_address(addr, "загрузке памяти")
+                    self.memory[addr] = int(value)
+            return
+
+        image = array("q")
+        with open(path, "rb") as file:
+            image.frombytes(file.read())
+        if sys.byteorder == "big":
+            image.byteswap()
+        if len(image) > len(self.memory):
+            raise ValueError(f"Образ памяти {path} больше памяти интерпретатора")
+        self.memory[:len(image)] = image
+
     def save_results(self):
         start, end = self.memory_range
+        # Срез молча обрезал бы диапазон за пределами памяти, поэтому границы проверяются явно
+        self.check_address(start, "сохранении результата")
+        self.check_address(end, "сохранении результата")
+        if start > end:
+            raise ValueError(f"Начало диапазона {start} больше конца {end}")
+        if self.result_file.endswith(".npy"):
+            # Двоичный результат; CSV из него строит binlog.export_results_csv
+            binlog.save_results(self.result_file, start, self.memory[start:end + 1])
+            return
         with open(self.result_file, "w", newline="") as file:
             writer = csv.writer(file)
             writer.writerow(["Address", "Value"])
-            for addr in range(start, end + 1):
-                writer.writerow([addr, self.memory[addr]])
+            # Весь диапазон записывается одним вызовом вместо строки за строкой
+            writer.writerows(zip(range(start, end + 1), self.memory[start:end + 1]))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Интерпретатор УВМ.")
     parser.add_argument("-i", "--input", required=True, help="Путь к бинарному файлу")
-    parser.add_argument("-r", "--result", required=True, help="Путь к файлу результата")
+    parser.add_argument("-r", "--result", required=True, help="Путь к файлу результата (CSV или .npy)")
     parser.add_argument("--range", required=True, type=int, nargs=2, help="Диапазон памяти (start end)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Выводить выполнение LOAD и MIN")
+    parser.add_argument("--memory-size", type=int, default=MEMORY_SIZE,
+                        help=f"Размер памяти в ячейках (не больше {MAX_MEMORY_SIZE})")
+    parser.add_argument("--jit", action="store_true", help="Компилировать блоки команд в функции Python")
+    parser.add_argument("--jit-threshold", type=int, default=0,
+                        help="Сколько раз блок выполняется циклом до компиляции")
+    parser.add_argument("--profile", choices=["json", "csv"],
+                        help="Сохранить профиль выполнения рядом с файлом результата")
+    parser.add_argument("--trace", type=int, default=64, help="Сколько последних команд хранить в трассе")
+    parser.add_argument("--checkpoint", help="Файл снимка для контрольных точек")
+    parser.add_argument("--checkpoint-every", type=int, default=1000000,
+                        help="Сколько команд выполнять между контрольными точками")
+    parser.add_argument("--resume", action="store_true", help="Продолжить выполнение с последней контрольной точки")
 
     args = parser.parse_args()
-    interpreter = Interpreter(args.input, args.result, args.range)
+    configure(logging.DEBUG if args.verbose else None)
+    profiler = None
+    if args.profile:
+        from profiler import Profiler
+        profiler = Profiler(args.trace)
+    interpreter = Interpreter(args.input, args.result, args.range, verbose=args.verbose,
+                              memory_size=args.memory_size, jit=args.jit, jit_threshold=args.jit_threshold,
+                              profiler=profiler, checkpoint_every=args.checkpoint_every)
     interpreter.load_program()
-    interpreter.execute()
+    if args.checkpoint:
+        from snapshot import Checkpointer
+        checkpointer = Checkpointer(args.checkpoint, interpreter)
+        if args.resume and os.path.exists(args.checkpoint):
+            checkpointer.restore()
+            log.info("Выполнение продолжено со смещения %s", checkpointer.next_offset())
+        else:
+            checkpointer.start()
+        interpreter.checkpoint = checkpointer
+    try:
+        interpreter.execute()
+    finally:
+        # Профиль сохраняется и при ошибке: трасса показывает команды перед ней
+        if profiler is not None:
+            log.info("Профиль сохранен: %s", profiler.save(args.result, args.profile))
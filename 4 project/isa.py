@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+# Поле команды: имя, ширина в битах, смещение от младшего бита
+Field = namedtuple("Field", "name width offset")
+
+OPCODE_BITS = 3
+OPCODE_MASK = (1 << OPCODE_BITS) - 1
+ADDRESS_BITS = 23
+
+# Декларативное описание формата команд: поля упакованы от младшего бита,
+# байты команды записываются в порядке little-endian
+INSTRUCTION_TABLE = {
+    # A=2, B - константа (17 бит), C - адрес (23 бита)
+    "LOAD": (2, 6, [Field("A", 3, 0), Field("B", 17, 3), Field("C", 23, 20)]),
+    # A=7, B - смещение (10 бит), C и D - адреса (23 бита каждый)
+    "READ": (7, 8, [Field("A", 3, 0), Field("B", 10, 3), Field("C", 23, 13), Field("D", 23, 36)]),
+    # A=3, B и C - адреса (23 бита каждый)
+    "WRITE": (3, 7, [Field("A", 3, 0), Field("B", 23, 3), Field("C", 23, 26)]),
+    # A=6, B, C и D - адреса (23 бита каждый)
+    "MIN": (6, 9, [Field("A", 3, 0), Field("B", 23, 3), Field("C", 23, 26), Field("D", 23, 49)]),
+}
+
+
+class InstructionFormat:
+    """Формат одной команды: упаковщик и сгенерированный по той же таблице распаковщик."""
+
+    def __init__(self, name, opcode, size, fields):
+        self.name = name
+        self.opcode = opcode
+        self.size = size
+        self.fields = fields
+        # Операнды после A: их кодирует и декодирует формат
+        self.operand_fields = fields[1:]
+        self.shifts = tuple(field.offset for field in self.operand_fields)
+        self.limits = tuple(1 << field.width for field in self.operand_fields)
+        self.decoder_source = self._decoder_source()
+        namespace = {}
+        exec(compile(self.decoder_source, f"<decoder {name}>", "exec"), namespace)
+        self.decode = namespace["decode"]
+        self.decode_word = namespace["decode_word"]
+
+        if fields[0].name != "A" or fields[0].width != OPCODE_BITS or fields[0].offset != 0:
+            raise ValueError(f"Поле A команды {name} должно занимать младшие {OPCODE_BITS} бита")
+        if sum(field.width for field in fields) > size * 8:
+            raise ValueError(f"Поля команды {name} не помещаются в {size} байт")
+
+    def _decoder_source(self):
+        """Текст функций распаковки: по одному сдвигу и маске на каждое поле."""
+        parts = ", ".join(f"(word >> {field.offset}) & {hex((1 << field.width) - 1)}"
+                          for field in self.operand_fields)
+        return (
+            f"def decode_word(word):\n"
+            f"    return ({parts},)\n"
+            f"\n"
+            f"def decode(data, offset):\n"
+            f"    word = int.from_bytes(data[offset:offset + {self.size}], 'little')\n"
+            f"    return ({parts},)\n"
+        )
+
+    def encode(self, operands):
+        """Упаковывает операнды B, C, D... в целое число команды."""
+        if len(operands) != len(self.operand_fields):
+            raise ValueError(f"Команда {self.name} ожидает {len(self.operand_fields)} операнда после A")
+        word = self.opcode
+        for value, shift, limit, field in zip(operands, self.shifts, self.limits, self.operand_fields):
+            if not (0 <= value < limit):
+                raise ValueError(f"Поле {field.name} команды {self.name} должно быть в диапазоне [0, {limit - 1}]")
+            word |= value << shift
+        return word
+
+    def pack_into(self, buffer, operands):
+        """Дописывает закодированную команду в bytearray."""
+        buffer += self.encode(operands).to_bytes(self.size, "little")
+
+
+FORMATS = {name: InstructionFormat(name, opcode, size, fields)
+           for name, (opcode, size, fields) in INSTRUCTION_TABLE.items()}
+FORMATS_BY_OPCODE = {fmt.opcode: fmt for fmt in FORMATS.values()}
+OPCODES = {name: fmt.opcode for name, fmt in FORMATS.items()}
+
+# Псевдокоманда векторного MIN: в бинарном файле не встречается, создается интерпретатором при загрузке
+VECTOR_MIN = OPCODE_MASK + 1
+
+
+def decode_program(program):
+    """Разбирает бинарную программу в список (смещение, формат, операнды)."""
+    instructions = []
+    pointer = 0
+    length = len(program)
+    while pointer < length:
+        fmt = FORMATS_BY_OPCODE.get(program[pointer] & OPCODE_MASK)
+        if fmt is None:
+            raise ValueError(f"Неизвестная команда: {hex(program[pointer])}")
+        if pointer + fmt.size > length:
+            raise ValueError(f"Команда {fmt.name} по смещению {pointer} обрезана")
+        instructions.append((pointer, fmt, fmt.decode(program, pointer)))
+        pointer += fmt.size
+    return instructions
@@ -0,0 +1,94 @@
+"""Компиляция линейных блоков предекодированной программы в функции Python."""
+from isa import FORMATS, VECTOR_MIN
+
+# Количество команд в одном компилируемом блоке
+BLOCK_SIZE = 256
+
+LOAD = FORMATS["LOAD"].opcode
+READ = FORMATS["READ"].opcode
+WRITE = FORMATS["WRITE"].opcode
+MIN = FORMATS["MIN"].opcode
+
+
+class _BlockBuilder:
+    """Генерирует текст функции блока, держа ячейки памяти с известными адресами в локальных переменных."""
+
+    def __init__(self):
+        self.lines = []
+        # Адреса, значения которых сейчас лежат в локальных переменных v<адрес>
+        self.cached = set()
+        # Адреса, у которых локальная переменная новее, чем память
+        self.dirty = set()
+
+    def emit(self, line):
+        self.lines.append("    " + line)
+
+    def read(self, addr):
+        if addr not in self.cached:
+            self.emit(f"v{addr} = m[{addr}]")
+            self.cached.add(addr)
+        return f"v{addr}"
+
+    def write(self, addr, expression):
+        self.emit(f"v{addr} = {expression}")
+        self.cached.add(addr)
+        self.dirty.add(addr)
+
+    def flush(self):
+        """Записывает измененные переменные в память перед обращением по вычисляемому адресу."""
+        for addr in sorted(self.dirty):
+            self.emit(f"m[{addr}] = v{addr}")
+        self.dirty.clear()
+
+    def instruction(self, opcode, b, c, d):
+        # Адреса из самих команд проверены при загрузке, поэтому здесь проверок нет
+        if opcode == LOAD:
+            self.write(c, str(b))
+        elif opcode == MIN:
+            first, second = self.read(b), self.read(c)
+            self.write(d, f"{first} if {first} <= {second} else {second}")
+        elif opcode == READ:
+            base = self.read(c)
+            self.flush()
+            self.emit(f"t = {base} + {b}")
+            self.emit('if not 0 <= t < size: check_address(t, "READ computed")')
+            self.write(d, "m[t]")
+        elif opcode == WRITE:
+            target, value = self.read(c), self.read(b)
+            self.flush()
+            self.emit(f"t = {target}")
+            self.emit('if not 0 <= t < size: check_address(t, "WRITE destination")')
+            self.emit(f"m[t] = {value}")
+            # Запись могла изменить любую ячейку, закэшированные значения больше недействительны
+            self.cached.clear()
+        elif opcode == VECTOR_MIN:
+            self.flush()
+            self.emit(f"vector_min({b}, {c}, {d})")
+            self.cached.clear()
+        else:
+            raise ValueError(f"Неизвестная команда: {opcode}")
+
+    def source(self):
+        self.flush()
+        body = self.lines or ["    pass"]
+        return "def block(m=memory, size=size, check_address=check_address, vector_min=vector_min):\n" + "\n".join(body) + "\n"
+
+
+def block_source(code, start, end):
+    """Текст функции, выполняющей команды code[start:end]."""
+    builder = _BlockBuilder()
+    for index in range(start, end):
+        builder.instruction(*code[index])
+    return builder.source()
+
+
+def compile_block(code, start, end, memory, check_address, vector_min):
+    """Компилирует команды code[start:end] в функцию без аргументов, работающую с memory."""
+    namespace = {
+        "memory": memory,
+        "size": len(memory),
+        "check_address": check_address,
+        "vector_min": vector_min,
+    }
+    exec(compile(block_source(code, start, end), f"<block {start}>", "exec"), namespace)
+    return namespace["block"]
@@ -0,0 +1,96 @@
+"""Peephole-оптимизация потока команд между ассемблером и интерпретатором.
+
+Команда - тройка (номер строки исходника, имя, операнды после A). Адреса
+READ по вычисляемому адресу и WRITE по указателю заранее неизвестны, поэтому
+такая команда считается чтением или записью любой ячейки. Сами READ и WRITE
+никогда не удаляются: при выполнении они могут завершиться ошибкой адреса.
+По той же причине мертвая запись удаляется, только если все ее адреса
+заведомо лежат в памяти размера memory_size.
+"""
+from interpreter import MEMORY_SIZE
+
+
+class OptimizationStats:
+    def __init__(self):
+        self.folded = 0       # MIN с известными операндами заменены на LOAD
+        self.redundant = 0    # LOAD значения, которое уже лежит в ячейке
+        self.dead = 0         # записи, перезаписанные до чтения
+
+    @property
+    def removed(self):
+        return self.redundant + self.dead
+
+    def summary(self):
+        return (f"свернуто MIN: {self.folded}, удалено повторных LOAD: {self.redundant}, "
+                f"удалено мертвых записей: {self.dead}")
+
+
+def propagate_constants(instructions, stats):
+    """Прямой проход: известные значения ячеек, свертка MIN и удаление повторных LOAD."""
+    known = {}
+    result = []
+    for line, name, operands in instructions:
+        if name == "MIN":
+            b, c, d = operands
+            if b in known and c in known:
+                # Значения ячеек появляются только из LOAD, поэтому минимум помещается в поле B команды LOAD
+                name, operands = "LOAD", (min(known[b], known[c]), d)
+                stats.folded += 1
+            else:
+                known.pop(d, None)
+        if name == "LOAD":
+            value, c = operands
+            if known.get(c) == value:
+                stats.redundant += 1
+                continue
+            known[c] = value
+        elif name == "READ":
+            known.pop(operands[2], None)
+        elif name == "WRITE":
+            # Запись по указателю может изменить любую ячейку
+            known.clear()
+        result.append((line, name, operands))
+    return result
+
+
+def eliminate_dead_stores(instructions, stats, memory_size=MEMORY_SIZE):
+    """Обратный проход: удаляет LOAD и MIN, результат которых перезаписывается до чтения.
+
+    После конца программы любая ячейка может попасть в результат, поэтому
+    последние записи всегда живые. Команда с адресом за пределами памяти
+    остается, чтобы интерпретатор сообщил об ошибке, как и без оптимизации.
+    """
+    # Ячейки, текущее значение которых гарантированно перезапишется до чтения
+    dead = set()
+    result = []
+    for line, name, operands in reversed(instructions):
+        if name == "LOAD":
+            written, reads = operands[1], ()
+        elif name == "MIN":
+            written, reads = operands[2], operands[:2]
+        elif name == "READ":
+            written, reads = operands[2], (operands[1],)
+        else:  # WRITE: запись по неизвестному адресу ничего не делает мертвым
+            written, reads = None, operands
+
+        if written in dead and name in ("LOAD", "MIN") and all(addr < memory_size for addr in (written, *reads)):
+            stats.dead += 1
+            continue
+        if written is not None:
+            dead.add(written)
+        if name == "READ":
+            # Чтение по вычисляемому адресу может затронуть любую ячейку
+            dead.clear()
+        else:
+            dead.difference_update(reads)
+        result.append((line, name, operands))
+    result.reverse()
+    return result
+
+
+def optimize(instructions, memory_size=MEMORY_SIZE):
+    """Возвращает оптимизированный список команд и статистику."""
+    stats = OptimizationStats()
+    instructions = propagate_constants(instructions, stats)
+    instructions = eliminate_dead_stores(instructions, stats, memory_size)
+    return instructions, stats
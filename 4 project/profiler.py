@@ -0,0 +1,116 @@
+"""Профилирование выполнения программ УВМ: отдельный инструментированный цикл интерпретатора."""
+import csv
+import json
+import os
+import time
+from collections import Counter, deque
+
+from isa import ADDRESS_BITS, FORMATS, FORMATS_BY_OPCODE, VECTOR_MIN
+
+LOAD = FORMATS["LOAD"].opcode
+READ = FORMATS["READ"].opcode
+WRITE = FORMATS["WRITE"].opcode
+MIN = FORMATS["MIN"].opcode
+ADDRESS_MASK = (1 << ADDRESS_BITS) - 1
+
+OPCODE_NAMES = {opcode: fmt.name for opcode, fmt in FORMATS_BY_OPCODE.items()}
+OPCODE_NAMES[VECTOR_MIN] = "VECTOR_MIN"
+
+
+def _accesses(memory, opcode, b, c, d):
+    """Адреса, которые команда прочитает и запишет (вычисляется до ее выполнения)."""
+    if opcode == LOAD:
+        return (), (c,)
+    if opcode == READ:
+        return (c, memory[c] + b), (d,)
+    if opcode == WRITE:
+        return (c, b), (memory[c],)
+    if opcode == MIN:
+        return (b, c), (d,)
+    n = d >> ADDRESS_BITS
+    d &= ADDRESS_MASK
+    return (range(b, b + n), range(c, c + n)), (range(d, d + n),)
+
+
+class Profiler:
+    """Счетчики и время по командам, гистограммы обращений к памяти и кольцевой буфер трассы.
+
+    Интерпретатор вызывает run() вместо своего основного цикла, поэтому
+    без профилировщика выполнение не платит за инструментирование.
+    """
+
+    def __init__(self, trace_size=64):
+        self.counts = Counter()
+        self.times = Counter()
+        self.reads = Counter()
+        self.writes = Counter()
+        # Последние trace_size команд: (номер, смещение, имя, операнды)
+        self.trace = deque(maxlen=trace_size)
+        self.error = None
+
+    def run(self, interpreter, table):
+        memory = interpreter.memory
+        code = interpreter.code
+        offsets = interpreter.offsets
+        counts, times = self.counts, self.times
+        reads, writes = self.reads, self.writes
+        trace = self.trace
+        clock = time.perf_counter
+        for index in range(interpreter.pc, len(code)):
+            opcode, b, c, d = code[index]
+            trace.append((index, offsets[index], opcode, b, c, d))
+            read, written = _accesses(memory, opcode, b, c, d)
+            started = clock()
+            try:
+                table[opcode](b, c, d)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                raise
+            times[opcode] += clock() - started
+            counts[opcode] += 1
+            for addresses, histogram in ((read, reads), (written, writes)):
+                if opcode == VECTOR_MIN:
+                    for block in addresses:
+                        histogram.update(block)
+                else:
+                    histogram.update(addresses)
+
+    def report(self, top=20):
+        """Сводка в виде словаря для экспорта в JSON."""
+        return {
+            "instructions": {OPCODE_NAMES[opcode]: {"count": count, "time": self.times[opcode]}
+                             for opcode, count in sorted(self.counts.items())},
+            "hot_reads": self.reads.most_common(top),
+            "hot_writes": self.writes.most_common(top),
+            "trace": [{"index": index, "offset": offset, "command": OPCODE_NAMES[opcode],
+                       "operands": [b, c, d]}
+                      for index, offset, opcode, b, c, d in self.trace],
+            "error": self.error,
+        }
+
+    def save_json(self, path, top=20):
+        with open(path, "w") as file:
+            json.dump(self.report(top), file, ensure_ascii=False, indent=2)
+
+    def save_csv(self, path, top=20):
+        """Один CSV: раздел, ключ, количество, время."""
+        report = self.report(top)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["section", "key", "count", "time"])
+            writer.writerows(("instruction", name, stats["count"], stats["time"])
+                             for name, stats in report["instructions"].items())
+            writer.writerows(("read", addr, count, "") for addr, count in report["hot_reads"])
+            writer.writerows(("write", addr, count, "") for addr, count in report["hot_writes"])
+            writer.writerows(("trace", f"{entry['offset']}: {entry['command']} "
+                              f"{' '.join(map(str, entry['operands']))}", entry["index"], "")
+                             for entry in report["trace"])
+
+    def save(self, result_file, fmt="json", top=20):
+        """Сохраняет профиль рядом с файлом результата: result.csv -> result.profile.json."""
+        path = os.path.splitext(result_file)[0] + ".profile." + fmt
+        if fmt == "csv":
+            self.save_csv(path, top)
+        else:
+            self.save_json(path, top)
+        return path
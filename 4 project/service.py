@@ -0,0 +1,187 @@
+"""Долгоживущий сервис сборки и выполнения программ УВМ.
+
+Запросы и ответы - JSON по одному объекту в строке (stdin/stdout или Unix-сокет):
+  {"id": 1, "source": "LOAD 2 5 10", "range": [10, 12], "memory": {"11": 3}, "optimize": false}
+  {"id": 1, "values": [5, 3, 0], "cached": false}
+Программы кэшируются по хэшу исходника, обработчики держат уже загруженные
+интерпретаторы, а сборка и выполнение идут в разных пулах, так что сборка
+следующего запроса перекрывается с выполнением предыдущего.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from assembler import Assembler
+from common.pool import WorkerCache
+from interpreter import MEMORY_SIZE, Interpreter
+
+# Интерпретаторы процесса-обработчика по (хэш программы, размер памяти)
+_interpreters = WorkerCache()
+
+
+def assemble_program(source, optimize=False, memory_size=MEMORY_SIZE):
+    return Assembler(None, None, None, optimize=optimize, memory_size=memory_size).assemble_source(source)
+
+
+def _load(program, memory_size):
+    # Повторные запуски той же программы выполняются скомпилированными блоками
+    interpreter = Interpreter(None, None, None, memory_size=memory_size, jit=True)
+    interpreter.load_bytes(program)
+    return interpreter
+
+
+def execute_program(key, program, memory_size, memory, start, end):
+    """Выполняет программу на прогретом интерпретаторе и возвращает диапазон памяти."""
+    interpreter = _interpreters.get((key, memory_size), lambda: _load(program, memory_size), Interpreter.reset)
+    for addr, value in memory:
+        interpreter.check_address(addr, "загрузке памяти")
+        interpreter.memory[addr] = value
+    interpreter.run()
+    interpreter.check_address(start, "чтении результата")
+    interpreter.check_address(end, "чтении результата")
+    return interpreter.memory[start:end + 1].tolist()
+
+
+class Service:
+    def __init__(self, jobs=None, cache_size=128, processes=True):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.processes = processes
+        # Хэш исходника -> future с бинарным кодом (в том числе еще собираемым)
+        self.programs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.assemble_pool = None
+        self.execute_pool = None
+        self.limit = None
+
+    def start(self):
+        executor = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        # Сборка обычно быстрее выполнения, поэтому ей достаточно части обработчиков
+        self.assemble_pool = executor(max(1, self.jobs // 2))
+        self.execute_pool = executor(self.jobs)
+        # Не больше двух задач в работе на обработчик: остальные ждут в очереди
+        self.limit = asyncio.Semaphore(self.jobs * 2)
+
+    def close(self):
+        for pool in (self.assemble_pool, self.execute_pool):
+            if pool is not None:
+                pool.shutdown()
+
+    async def program(self, source, optimize, memory_size=MEMORY_SIZE):
+        """Возвращает (ключ, бинарный код, из кэша ли); одинаковые исходники собираются один раз."""
+        # Результат оптимизации зависит от размера памяти, без оптимизации - нет
+        settings = f"{memory_size}" if optimize else "0"
+        key = hashlib.sha256(f"{settings}:{source}".encode()).hexdigest()
+        future = self.programs.get(key)
+        if future is not None:
+            self.hits += 1
+            self.programs.move_to_end(key)
+            return key, await future, True
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.assemble_pool, assemble_program, source, optimize, memory_size)
+        self.programs[key] = future
+        while len(self.programs) > self.cache_size:
+            self.programs.popitem(last=False)
+        try:
+            return key, await future, False
+        except Exception:
+            # Ошибочный исходник не кэшируется: его могут исправить и прислать снова
+            self.programs.pop(key, None)
+            raise
+
+    async def handle(self, request):
+        if request.get("op") == "stats":
+            return {"id": request.get("id"), "cached_programs": len(self.programs),
+                    "hits": self.hits, "misses": self.misses}
+
+        async with self.limit:
+            memory_size = int(request.get("memory_size", MEMORY_SIZE))
+            key, program, cached = await self.program(request["source"], bool(request.get("optimize", False)),
+                                                      memory_size)
+            start, end = request.get("range", (0, 0))
+            memory = [(int(addr), int(value)) for addr, value in dict(request.get("memory", {})).items()]
+            loop = asyncio.get_running_loop()
+            values = await loop.run_in_executor(
+                self.execute_pool, execute_program, key, program, memory_size, memory, int(start), int(end))
+        return {"id": request.get("id"), "values": values, "cached": cached}
+
+    async def respond(self, line, write):
+        request = {}
+        try:
+            request = json.loads(line)
+            response = await self.handle(request)
+        except Exception as e:
+            response = {"id": request.get("id") if isinstance(request, dict) else None,
+                        "error": f"{type(e).__name__}: {e}"}
+        await write(json.dumps(response, ensure_ascii=False) + "\n")
+
+    async def serve(self, reader, write):
+        """Читает запросы построчно; ответы отправляются по готовности, порядок задает поле id."""
+        tasks = set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.ensure_future(self.respond(line, write))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+async def serve_stdio(service):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    async def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    await service.serve(reader, write)
+
+
+async def serve_socket(service, path):
+    async def client(reader, writer):
+        async def write(text):
+            writer.write(text.encode())
+            await writer.drain()
+
+        try:
+            await service.serve(reader, write)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(client, path=path)
+    async with server:
+        await server.serve_forever()
+
+
+async def main(args):
+    service = Service(args.jobs, args.cache_size)
+    service.start()
+    try:
+        if args.socket:
+            await serve_socket(service, args.socket)
+        else:
+            await serve_stdio(service)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервис сборки и выполнения программ УВМ (JSON lines).")
+    parser.add_argument("--socket", help="Путь к Unix-сокету; без него используются stdin/stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Количество процессов-обработчиков")
+    parser.add_argument("--cache-size", type=int, default=128, help="Сколько собранных программ хранить")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,148 @@
+"""Контрольные точки состояния УВМ: счетчик команд и память в дельта-кодированном файле.
+
+Файл снимка начинается с заголовка, за которым следуют записи. Каждая запись
+содержит смещение следующей команды и только те страницы памяти, которые
+изменились с предыдущей записи (первая - изменившиеся относительно нулевой
+памяти), и заканчивается CRC32. Записи только дописываются в конец, поэтому
+прерванная запись не портит предыдущие: при восстановлении она отбрасывается.
+"""
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"UVMS"
+VERSION = 1
+PAGE_CELLS = 512
+PAGE_BYTES = PAGE_CELLS * 8
+
+# Сигнатура, версия, порядок байтов ячеек, размер памяти, SHA-256 программы
+HEADER = struct.Struct("<4sHcI32s")
+# Смещение следующей команды в бинарном файле, число страниц в записи
+RECORD = struct.Struct("<QI")
+PAGE_INDEX = struct.Struct("<I")
+CRC = struct.Struct("<I")
+BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+
+
+def program_digest(program):
+    return hashlib.sha256(program).digest()
+
+
+class Checkpointer:
+    """Пишет контрольные точки интерпретатора и восстанавливает его состояние из них."""
+
+    def __init__(self, path, interpreter):
+        self.path = path
+        self.interpreter = interpreter
+        self.digest = program_digest(interpreter.program)
+        # Содержимое памяти на момент последней записи: с ним сравниваются страницы
+        self.previous = bytearray(len(interpreter.memory) * 8)
+        self.records = 0
+
+    def header(self):
+        return HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(self.interpreter.memory), self.digest)
+
+    def start(self):
+        """Создает новый файл снимка."""
+        with open(self.path, "wb") as file:
+            file.write(self.header())
+        self.previous = bytearray(len(self.interpreter.memory) * 8)
+        self.records = 0
+
+    def next_offset(self):
+        """Смещение в бинарном файле команды, с которой продолжится выполнение."""
+        interpreter = self.interpreter
+        if interpreter.pc < len(interpreter.offsets):
+            return interpreter.offsets[interpreter.pc]
+        return len(interpreter.program)
+
+    def save(self):
+        """Дописывает запись с изменившимися страницами памяти."""
+        current = memoryview(self.interpreter.memory).cast("B")
+        previous = self.previous
+        pages = []
+        for start in range(0, len(previous), PAGE_BYTES):
+            end = start + PAGE_BYTES
+            if current[start:end] != previous[start:end]:
+                pages.append(PAGE_INDEX.pack(start // PAGE_BYTES))
+                pages.append(current[start:end].tobytes())
+                previous[start:end] = current[start:end]
+
+        record = RECORD.pack(self.next_offset(), len(pages) // 2) + b"".join(pages)
+        with open(self.path, "ab") as file:
+            file.write(record + CRC.pack(zlib.crc32(record)))
+            file.flush()
+            # Запись должна оказаться на диске до продолжения выполнения
+            os.fsync(file.fileno())
+        self.records += 1
+
+    def restore(self):
+        """Восстанавливает память и счетчик команд по последней целой записи снимка."""
+        interpreter = self.interpreter
+        with open(self.path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Файл снимка {self.path} поврежден")
+        magic, version, byte_order, memory_size, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} не является снимком УВМ")
+        if byte_order != BYTE_ORDER:
+            raise ValueError("Снимок создан на платформе с другим порядком байтов")
+        if memory_size != len(interpreter.memory):
+            raise ValueError(f"Снимок создан для памяти {memory_size} ячеек, а не {len(interpreter.memory)}")
+        if digest != self.digest:
+            raise ValueError("Снимок создан для другой программы")
+
+        state = bytearray(memory_size * 8)
+        offset = None
+        pos = HEADER.size
+        records = 0
+        while pos + RECORD.size <= len(data):
+            next_offset, page_count = RECORD.unpack_from(data, pos)
+            end = pos + RECORD.size
+            pages = []
+            for _ in range(page_count):
+                if end + PAGE_INDEX.size > len(data):
+                    break
+                (index,) = PAGE_INDEX.unpack_from(data, end)
+                start = index * PAGE_BYTES
+                size = min(PAGE_BYTES, len(state) - start)
+                pages.append((start, end + PAGE_INDEX.size, size))
+                end += PAGE_INDEX.size + size
+            if len(pages) != page_count or end + CRC.size > len(data):
+                break
+            (crc,) = CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[pos:end]):
+                break
+            for start, source, size in pages:
+                state[start:start + size] = data[source:source + size]
+            offset = next_offset
+            records += 1
+            pos = end + CRC.size
+
+        if offset is None:
+            raise ValueError(f"В снимке {self.path} нет ни одной целой записи")
+
+        # Недописанный хвост удаляется, чтобы следующие записи шли сразу за последней целой
+        if pos < len(data):
+            with open(self.path, "r+b") as file:
+                file.truncate(pos)
+
+        interpreter.memory[:] = array("q", bytes(state))
+        interpreter.pc = self.command_index(offset)
+        self.previous = state
+        self.records = records
+
+    def command_index(self, offset):
+        """Номер команды в предекодированной программе по смещению в бинарном файле."""
+        offsets = self.interpreter.offsets
+        if offset == len(self.interpreter.program):
+            return len(offsets)
+        index = bisect_left(offsets, offset)
+        if index == len(offsets) or offsets[index] != offset:
+            raise ValueError(f"Смещение {offset} из снимка не совпадает с началом команды")
+        return index
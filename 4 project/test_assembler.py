@@ -2,6 +2,7 @@ import unittest
 from assembler import Assembler
 import os
 import tempfile
+from unittest import mock
 
 class TestAssembler(unittest.TestCase):
     def setUp(self):
@@ -130,5 +131,45 @@ class TestAssembler(unittest.TestCase):
         with self.assertRaises(ValueError):
             assembler.assemble()
 
+    def test_labels_and_equ(self):
+        # Символы .equ и метки (смещение команды в байтах), в том числе ссылки вперед
+        with open(self.input_file, 'w') as f:
+            f.write(".equ BASE 100\n"
+                    "start: LOAD 2 end BASE+1  # метка end определена ниже\n"
+                    "MIN 6 BASE BASE+1 BASE-50\n"
+                    "end:\n")
+
+        assembler = Assembler(self.input_file, self.output_file, self.log_file)
+        assembler.assemble()
+
+        self.assertEqual(assembler.symbols, {"BASE": 100, "start": 0, "end": 15})
+        with open(self.output_file, 'rb') as f:
+            binary_data = f.read()
+        expected = Assembler(None, None, None).assemble_source("LOAD 2 15 101\nMIN 6 100 101 50\n")
+        self.assertEqual(binary_data, expected)
+
+    def test_undefined_symbol(self):
+        with open(self.input_file, 'w') as f:
+            f.write("LOAD 2 missing 1")
+
+        assembler = Assembler(self.input_file, self.output_file, self.log_file)
+        with self.assertRaises(ValueError):
+            assembler.assemble()
+
+    def test_large_program_in_chunks(self):
+        # Программа больше одного блока записи собирается так же, как в памяти
+        source = "".join(f"LOAD 2 {i % 1000} {i}\n" for i in range(2000))
+        with open(self.input_file, 'w') as f:
+            f.write(source)
+
+        assembler = Assembler(self.input_file, self.output_file, self.log_file)
+        with mock.patch("assembler.CHUNK_SIZE", 100):
+            assembler.assemble()
+
+        with open(self.output_file, 'rb') as f:
+            binary_data = f.read()
+        self.assertEqual(len(binary_data), 2000 * 6)
+        self.assertEqual(binary_data, Assembler(None, None, None).assemble_source(source))
+
 if __name__ == '__main__':
     unittest.main()
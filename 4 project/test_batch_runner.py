@@ -0,0 +1,93 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+
+from assembler import Assembler
+import batch_runner
+from batch_runner import run_batch, save_columns
+from common.pool import WORKER_CACHE_SIZE
+from interpreter import Interpreter
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_program(self, name, source):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(Assembler(None, None, None).assemble_source(source))
+        return path
+
+    def test_one_program_many_images(self):
+        program = self.write_program("min.bin", "MIN 6 0 1 2\n")
+        images = []
+        for index, cells in enumerate([(5, 3), (1, 9), (4, 4)]):
+            path = os.path.join(self.temp_dir, f"image{index}.bin")
+            with open(path, "wb") as f:
+                f.write(array("q", cells).tobytes())
+            images.append(path)
+
+        for jobs in (1, 2):
+            columns, errors = run_batch([program], (0, 2), images, jobs=jobs)
+            self.assertEqual(errors, [])
+            self.assertEqual([label for label, _ in columns], ["image0", "image1", "image2"])
+            self.assertEqual([list(values) for _, values in columns], [[5, 3, 3], [1, 9, 1], [4, 4, 4]])
+
+    def test_many_programs_columnar_output(self):
+        first = self.write_program("first.bin", "LOAD 2 1 0\nLOAD 2 2 1\n")
+        second = self.write_program("second.bin", "LOAD 2 7 1\n")
+        broken = self.write_program("broken.bin", "LOAD 2 1 0\nWRITE 3 0 2\nLOAD 2 9000 1\nWRITE 3 0 1\n")
+        columns, errors = run_batch([first, second, broken], (0, 1), jobs=1)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], broken)
+
+        result = os.path.join(self.temp_dir, "result.csv")
+        save_columns(result, (0, 1), columns)
+        with open(result, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [["Address", "first", "second"], ["0", "1", "0"], ["1", "2", "7"]])
+
+    def test_range_is_checked(self):
+        program = self.write_program("load.bin", "LOAD 2 1 0\n")
+        for memory_range in ((2040, 3000), (-3, 2), (5, 1)):
+            columns, errors = run_batch([program], memory_range, jobs=1)
+            self.assertEqual(columns, [])
+            self.assertEqual(len(errors), 1)
+            self.assertIn("ValueError", errors[0][2])
+
+    def test_worker_cache_is_bounded(self):
+        programs = [self.write_program(f"p{index}.bin", f"LOAD 2 {index} 0\n")
+                    for index in range(WORKER_CACHE_SIZE + 4)]
+        columns, errors = run_batch(programs, (0, 0), jobs=1)
+        self.assertEqual(errors, [])
+        self.assertEqual([list(values) for _, values in columns], [[index] for index in range(len(programs))])
+        self.assertEqual(len(batch_runner._worker_state["interpreters"]), WORKER_CACHE_SIZE)
+
+    def test_mmap_load_and_csv_image(self):
+        program = self.write_program("load.bin", "LOAD 2 3 5\n")
+        image = os.path.join(self.temp_dir, "image.csv")
+        with open(image, "w") as f:
+            f.write("Address,Value\n4,11\n")
+        interpreter = Interpreter(program, None, None)
+        interpreter.load_program()
+        interpreter.load_memory(image)
+        interpreter.run()
+        interpreter.close()
+        self.assertEqual(list(interpreter.memory[4:6]), [11, 3])
+
+        empty = os.path.join(self.temp_dir, "empty.bin")
+        open(empty, "wb").close()
+        interpreter = Interpreter(empty, None, None)
+        interpreter.load_program()
+        self.assertEqual(interpreter.code, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import binlog
+from assembler import Assembler
+from interpreter import Interpreter
+
+
+class TestBinaryLogs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "program.asm")
+        with open(self.source, "w") as f:
+            f.write("LOAD 2 42 100\n# комментарий\nREAD 7 1 100 101\nWRITE 3 100 101\nMIN 6 100 101 102\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def test_binary_log_matches_csv_view(self):
+        Assembler(self.source, self.path("a.bin"), self.path("program.log")).assemble()
+        Assembler(self.source, self.path("b.bin"), self.path("program.binlog")).assemble()
+
+        columns = binlog.load_log(self.path("program.binlog"))
+        self.assertEqual(list(columns["line"]), [1, 3, 4, 5])
+        self.assertEqual(list(columns["opcode"]), [2, 7, 3, 6])
+        self.assertEqual(list(columns["d"]), [0, 101, 0, 102])
+
+        binlog.export_log_csv(self.path("program.binlog"), self.path("export.log"))
+        with open(self.path("program.log")) as f, open(self.path("export.log")) as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_npy_results(self):
+        interpreter = Interpreter(None, self.path("result.npy"), (99, 102))
+        interpreter.load_bytes(Assembler(None, None, None).assemble_source("LOAD 2 42 100\nLOAD 2 7 102\n"))
+        interpreter.execute()
+
+        with open(self.path("result.npy"), "rb") as f:
+            data = f.read()
+        self.assertEqual((len(data) - 4 * 16) % 64, 0)  # данные выровнены по 64 байтам
+        addresses, values = binlog.load_results(self.path("result.npy"))
+        self.assertEqual(list(addresses), [99, 100, 101, 102])
+        self.assertEqual(list(values), [0, 42, 0, 7])
+
+        binlog.export_results_csv(self.path("result.npy"), self.path("result.csv"))
+        with open(self.path("result.csv")) as f:
+            self.assertEqual(f.read().splitlines(), ["Address,Value", "99,0", "100,42", "101,0", "102,7"])
+
+    def test_truncated_log(self):
+        with open(self.path("bad.binlog"), "wb") as f:
+            f.write(binlog.LOG_HEADER.pack(binlog.LOG_MAGIC, binlog.LOG_VERSION) + b"\x00" * 5)
+        with self.assertRaises(ValueError):
+            binlog.load_log(self.path("bad.binlog"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from collections import Counter
+
+from assembler import Assembler
+from benchmarks.generator import MEMORY_SIZE, generate
+from interpreter import Interpreter
+from isa import decode_program
+
+
+def assemble(kind, size):
+    return Assembler(None, None, None).assemble_source(generate(kind, size))
+
+
+def opcode_mix(program):
+    return Counter(fmt.name for _, fmt, _ in decode_program(program))
+
+
+class TestProgramGenerator(unittest.TestCase):
+    def test_load_heavy_is_only_loads(self):
+        program = assemble("load_heavy", 500)
+        self.assertEqual(opcode_mix(program), {"LOAD": 500})
+        self.assertTrue(all(c < MEMORY_SIZE for _, _, (_, c) in decode_program(program)))
+
+    def test_indirect_chains_stay_in_memory(self):
+        program = assemble("indirect_chains", 3000)
+        mix = opcode_mix(program)
+        self.assertEqual(mix["LOAD"], 1024)  # таблица указателей
+        self.assertGreater(mix["READ"], 0)
+        self.assertGreater(mix["WRITE"], 0)
+        # Указатели берутся из таблицы, поэтому вычисляемые адреса не выходят за память
+        interpreter = Interpreter(None, None, None, memory_size=MEMORY_SIZE)
+        interpreter.load_bytes(program)
+        interpreter.run()
+
+    def test_vector_min_is_fused(self):
+        interpreter = Interpreter(None, None, None, memory_size=MEMORY_SIZE)
+        interpreter.load_bytes(assemble("vector_min", 768))
+        # 512 LOAD и одна векторная операция вместо 256 MIN
+        self.assertEqual(len(interpreter.code), 513)
+
+    def test_mixed_uses_every_command(self):
+        mix = opcode_mix(assemble("mixed", 400))
+        self.assertEqual(set(mix), {"LOAD", "READ", "WRITE", "MIN"})
+        self.assertEqual(sum(mix.values()), 400)
+
+    def test_programs_are_reproducible(self):
+        # Базовые результаты бенчмарка сравнимы, только если программы не меняются от запуска к запуску
+        self.assertEqual(generate("mixed", 200), generate("mixed", 200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import random
+import tempfile
+import unittest
+
+from assembler import Assembler
+from interpreter import VECTOR_MIN, Interpreter, fuse_vector_ops, predecode
+
+
+def build(source):
+    return Assembler(None, None, None).assemble_source(source)
+
+
+class TestInterpreter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.result_file = os.path.join(self.temp_dir, "result.csv")
+
+    def tearDown(self):
+        if os.path.exists(self.result_file):
+            os.remove(self.result_file)
+        os.rmdir(self.temp_dir)
+
+    def run_source(self, source, memory_range=(0, 15)):
+        interpreter = Interpreter(None, self.result_file, memory_range)
+        interpreter.load_bytes(build(source))
+        interpreter.execute()
+        return interpreter
+
+    def test_all_commands(self):
+        interpreter = self.run_source(
+            "LOAD 2 7 0\n"      # memory[0] = 7
+            "LOAD 2 3 1\n"      # memory[1] = 3 (указатель)
+            "LOAD 2 42 10\n"    # memory[10] = 42
+            "READ 7 7 1 2\n"    # memory[2] = memory[memory[1] + 7] = memory[10]
+            "WRITE 3 0 1\n"     # memory[memory[1]] = memory[0] -> memory[3] = 7
+            "MIN 6 2 3 4\n"     # memory[4] = min(42, 7)
+        )
+        self.assertEqual(list(interpreter.memory[:5]), [7, 3, 42, 7, 7])
+        with open(self.result_file) as f:
+            rows = f.read().splitlines()
+        self.assertEqual(rows[0], "Address,Value")
+        self.assertEqual(rows[5], "4,7")
+
+    def test_result_range_checked(self):
+        for memory_range in [(2040, 2100), (-3, 2), (5, 4)]:
+            with self.assertRaises(ValueError):
+                self.run_source("LOAD 2 1 0\n", memory_range)
+            self.assertFalse(os.path.exists(self.result_file))
+
+    def test_predecode(self):
+        code, offsets = predecode(build("LOAD 2 5 1\nWRITE 3 1 2\nMIN 6 1 2 3\n"))
+        self.assertEqual(code, [(2, 5, 1, 0), (3, 1, 2, 0), (6, 1, 2, 3)])
+        self.assertEqual(list(offsets), [0, 6, 13])
+
+    def test_static_address_checked_at_load(self):
+        interpreter = Interpreter(None, self.result_file, (0, 1))
+        with self.assertRaises(ValueError):
+            interpreter.load_bytes(build("LOAD 2 1 5000"))
+
+    def test_dynamic_address_checked_at_run(self):
+        interpreter = Interpreter(None, self.result_file, (0, 1))
+        interpreter.load_bytes(build("LOAD 2 5000 0\nWRITE 3 1 0\n"))
+        with self.assertRaises(ValueError):
+            interpreter.run()
+
+    def test_reset_keeps_program(self):
+        interpreter = self.run_source("LOAD 2 9 4")
+        interpreter.reset()
+        self.assertEqual(interpreter.memory[4], 0)
+        interpreter.run()
+        self.assertEqual(interpreter.memory[4], 9)
+
+
+    def test_vector_min_fusion(self):
+        source = "".join(f"LOAD 2 {(i * 37) % 101} {i}\n" for i in range(64))
+        source += "".join(f"MIN 6 {i} {32 + i} {100 + i}\n" for i in range(32))
+        code, offsets = fuse_vector_ops(*predecode(build(source)))
+        self.assertEqual(code[-1][0], VECTOR_MIN)
+        self.assertEqual(len(code), 65)
+
+        fused = Interpreter(None, self.result_file, (0, 1))
+        fused.load_bytes(build(source))
+        fused.run()
+        plain = Interpreter(None, self.result_file, (0, 1), vectorize=False)
+        plain.load_bytes(build(source))
+        plain.run()
+        self.assertEqual(fused.memory, plain.memory)
+
+    def test_vector_min_overlap(self):
+        # Результат каждого MIN читается следующим: серию нельзя выполнять одной операцией
+        source = "LOAD 2 5 0\nLOAD 2 9 1\nLOAD 2 9 2\nLOAD 2 9 3\nLOAD 2 9 4\n"
+        source += "".join(f"MIN 6 {i} {i + 1} {i + 1}\n" for i in range(4))
+        interpreter = Interpreter(None, self.result_file, (0, 1))
+        interpreter.load_bytes(build(source))
+        interpreter.run()
+        self.assertEqual(list(interpreter.memory[:5]), [5, 5, 5, 5, 5])
+
+    def test_memory_size(self):
+        interpreter = Interpreter(None, self.result_file, (0, 1), memory_size=1 << 23)
+        interpreter.load_bytes(build("LOAD 2 1 8388607"))
+        interpreter.run()
+        self.assertEqual(interpreter.memory[(1 << 23) - 1], 1)
+        with self.assertRaises(ValueError):
+            Interpreter(None, self.result_file, (0, 1), memory_size=(1 << 23) + 1)
+
+
+    def test_jit_matches_interpreter(self):
+        # Косвенные READ/WRITE по тем же ячейкам, что и прямые команды блока
+        rng = random.Random(1)
+        lines = [f"LOAD 2 {rng.randrange(16)} {i}" for i in range(16)]
+        for _ in range(600):
+            kind = rng.randrange(4)
+            if kind == 0:
+                lines.append(f"LOAD 2 {rng.randrange(16)} {rng.randrange(16)}")
+            elif kind == 1:
+                lines.append(f"READ 7 {rng.randrange(8)} {rng.randrange(16)} {rng.randrange(16)}")
+            elif kind == 2:
+                lines.append(f"WRITE 3 {rng.randrange(16)} {rng.randrange(16)}")
+            else:
+                lines.append(f"MIN 6 {rng.randrange(16)} {rng.randrange(16)} {rng.randrange(16)}")
+        program = build("\n".join(lines))
+
+        plain = Interpreter(None, self.result_file, (0, 1), memory_size=32)
+        plain.load_bytes(program)
+        plain.run()
+        jitted = Interpreter(None, self.result_file, (0, 1), memory_size=32, jit=True, jit_threshold=1)
+        jitted.load_bytes(program)
+        for _ in range(3):
+            jitted.reset()
+            jitted.run()
+            self.assertEqual(jitted.memory, plain.memory)
+        self.assertEqual(len(jitted.blocks), 3)
+
+    def test_jit_dynamic_address(self):
+        interpreter = Interpreter(None, self.result_file, (0, 1), jit=True, jit_threshold=0)
+        interpreter.load_bytes(build("LOAD 2 7 1\nLOAD 2 5000 0\nWRITE 3 1 0\n"))
+        with self.assertRaises(ValueError):
+            interpreter.run()
+        # Значения, записанные до ошибки, попадают в память
+        self.assertEqual(interpreter.memory[1], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
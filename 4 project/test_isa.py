@@ -0,0 +1,45 @@
+import unittest
+from isa import FORMATS, decode_program
+
+
+class TestInstructionFormats(unittest.TestCase):
+    def test_roundtrip_all_formats(self):
+        # Каждый формат должен декодировать ровно то, что закодировал
+        samples = {
+            "LOAD": [(0, 0), (20, 869), ((1 << 17) - 1, (1 << 23) - 1)],
+            "READ": [(0, 0, 0), (5, 100, 200), ((1 << 10) - 1, (1 << 23) - 1, 1)],
+            "WRITE": [(0, 0), (300, 400), ((1 << 23) - 1, 7)],
+            "MIN": [(0, 0, 0), (100, 200, 300), ((1 << 23) - 1, 1, (1 << 23) - 1)],
+        }
+        for name, cases in samples.items():
+            fmt = FORMATS[name]
+            for operands in cases:
+                buffer = bytearray()
+                fmt.pack_into(buffer, operands)
+                self.assertEqual(len(buffer), fmt.size)
+                self.assertEqual(buffer[0] & 0b111, fmt.opcode)
+                self.assertEqual(fmt.decode(buffer, 0), operands)
+
+    def test_field_overflow(self):
+        with self.assertRaises(ValueError):
+            FORMATS["LOAD"].encode((1 << 17, 0))
+        with self.assertRaises(ValueError):
+            FORMATS["READ"].encode((0, 0, 1 << 23))
+
+    def test_decode_program(self):
+        buffer = bytearray()
+        FORMATS["LOAD"].pack_into(buffer, (42, 100))
+        FORMATS["MIN"].pack_into(buffer, (100, 101, 102))
+        program = decode_program(bytes(buffer))
+        self.assertEqual([(offset, fmt.name, ops) for offset, fmt, ops in program],
+                         [(0, "LOAD", (42, 100)), (6, "MIN", (100, 101, 102))])
+
+    def test_truncated_program(self):
+        buffer = bytearray()
+        FORMATS["MIN"].pack_into(buffer, (1, 2, 3))
+        with self.assertRaises(ValueError):
+            decode_program(bytes(buffer[:-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
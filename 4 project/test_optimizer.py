@@ -0,0 +1,79 @@
+import random
+import unittest
+
+from assembler import Assembler
+from interpreter import Interpreter
+from optimizer import optimize
+
+
+def run(program):
+    interpreter = Interpreter(None, None, None, memory_size=32)
+    interpreter.load_bytes(program)
+    interpreter.run()
+    return interpreter.memory
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_dead_and_redundant_loads(self):
+        instructions = [
+            (1, "LOAD", (5, 0)),       # перезаписывается строкой 2 до чтения
+            (2, "LOAD", (6, 0)),
+            (3, "LOAD", (6, 0)),       # то же значение уже лежит в ячейке
+            (4, "MIN", (0, 1, 2)),     # результат перезаписывается строкой 5
+            (5, "LOAD", (1, 2)),
+        ]
+        optimized, stats = optimize(instructions)
+        self.assertEqual([line for line, _, _ in optimized], [2, 5])
+        self.assertEqual((stats.redundant, stats.dead), (1, 2))
+
+    def test_min_folding(self):
+        optimized, stats = optimize([(1, "LOAD", (9, 0)), (2, "LOAD", (4, 1)), (3, "MIN", (0, 1, 2))])
+        self.assertEqual(optimized[-1], (3, "LOAD", (4, 2)))
+        self.assertEqual(stats.folded, 1)
+
+    def test_indirect_access_is_conservative(self):
+        instructions = [
+            (1, "LOAD", (3, 0)),
+            (2, "READ", (0, 5, 1)),    # может прочитать ячейку 0
+            (3, "LOAD", (4, 0)),
+            (4, "WRITE", (0, 6)),      # читает ячейку 0 и может записать в нее
+            (5, "LOAD", (4, 0)),
+        ]
+        optimized, stats = optimize(instructions)
+        self.assertEqual(optimized, instructions)
+        self.assertEqual(stats.removed, 0)
+
+    def test_out_of_range_store_is_kept(self):
+        instructions = [(1, "LOAD", (5, 40)), (2, "LOAD", (6, 40)), (3, "MIN", (50, 0, 1)), (4, "LOAD", (1, 1))]
+        optimized, stats = optimize(instructions, memory_size=32)
+        # Без оптимизации эти команды завершились бы ошибкой адреса, поэтому они остаются
+        self.assertEqual(optimized, instructions)
+        self.assertEqual(stats.dead, 0)
+
+    def test_labels_rejected(self):
+        with self.assertRaises(ValueError):
+            Assembler(None, None, None, optimize=True).assemble_source("LOAD 2 1 0\nend: LOAD 2 end 1\n")
+
+    def test_random_programs_keep_results(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            lines = []
+            for _ in range(120):
+                kind = rng.randrange(4)
+                if kind == 0:
+                    lines.append(f"LOAD 2 {rng.randrange(4)} {rng.randrange(16)}")
+                elif kind == 1:
+                    lines.append(f"READ 7 {rng.randrange(4)} {rng.randrange(16)} {rng.randrange(16)}")
+                elif kind == 2:
+                    lines.append(f"WRITE 3 {rng.randrange(16)} {rng.randrange(16)}")
+                else:
+                    lines.append(f"MIN 6 {rng.randrange(16)} {rng.randrange(16)} {rng.randrange(16)}")
+            source = "\n".join(lines)
+            plain = Assembler(None, None, None).assemble_source(source)
+            optimized = Assembler(None, None, None, optimize=True).assemble_source(source)
+            self.assertLessEqual(len(optimized), len(plain))
+            self.assertEqual(run(optimized), run(plain))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from assembler import Assembler
+from interpreter import Interpreter
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.result_file = os.path.join(self.temp_dir, "result.csv")
+
+    def tearDown(self):
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def profile(self, source, trace_size=64):
+        profiler = Profiler(trace_size)
+        interpreter = Interpreter(None, self.result_file, (0, 3), profiler=profiler)
+        interpreter.load_bytes(Assembler(None, None, None).assemble_source(source))
+        return interpreter, profiler
+
+    def test_counts_and_histograms(self):
+        interpreter, profiler = self.profile("LOAD 2 1 0\nLOAD 2 2 1\nMIN 6 0 1 2\nMIN 6 0 2 3\nREAD 7 1 0 3\n")
+        interpreter.execute()
+        report = profiler.report()
+        self.assertEqual({name: stats["count"] for name, stats in report["instructions"].items()},
+                         {"LOAD": 2, "READ": 1, "MIN": 2})
+        self.assertEqual(profiler.reads[0], 3)
+        self.assertEqual(profiler.reads[2], 2)  # MIN 0 2 3 и READ memory[0] + 1
+        self.assertEqual(profiler.writes[3], 2)
+        self.assertEqual(list(interpreter.memory[:4]), [1, 2, 1, 1])
+
+    def test_min_series_is_not_fused(self):
+        source = "".join(f"MIN 6 {i} {8 + i} {16 + i}\n" for i in range(8))
+        interpreter, profiler = self.profile(source)
+        interpreter.run()
+        self.assertEqual({name: stats["count"] for name, stats in profiler.report()["instructions"].items()},
+                         {"MIN": 8})
+        self.assertEqual(profiler.trace[-1][-3:], (7, 15, 23))
+
+    def test_trace_ring_buffer_after_error(self):
+        source = "".join(f"LOAD 2 {i} {i}\n" for i in range(10)) + "LOAD 2 5000 0\nWRITE 3 1 0\n"
+        interpreter, profiler = self.profile(source, trace_size=3)
+        with self.assertRaises(ValueError):
+            interpreter.run()
+        self.assertEqual([entry[0] for entry in profiler.trace], [9, 10, 11])
+        self.assertIn("5000", profiler.error)
+
+        path = profiler.save(self.result_file, "json")
+        self.assertTrue(path.endswith("result.profile.json"))
+        with open(path) as f:
+            self.assertEqual(json.load(f)["trace"][-1]["command"], "WRITE")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from service import Service
+
+PROGRAM = "LOAD 2 5 10\nMIN 6 10 11 12\n"
+
+
+class TestService(unittest.TestCase):
+    def run_requests(self, requests):
+        async def scenario():
+            service = Service(jobs=2, processes=False)
+            service.start()
+            reader = asyncio.StreamReader()
+            for request in requests:
+                reader.feed_data((request if isinstance(request, str) else json.dumps(request)).encode() + b"\n")
+            reader.feed_eof()
+            responses = []
+
+            async def write(text):
+                responses.append(json.loads(text))
+
+            try:
+                await service.serve(reader, write)
+            finally:
+                service.close()
+            return service, {response["id"]: response for response in responses}
+
+        return asyncio.run(scenario())
+
+    def test_execution_and_program_cache(self):
+        service, responses = self.run_requests([
+            {"id": 1, "source": PROGRAM, "range": [10, 12], "memory": {"11": 3}},
+            {"id": 2, "source": PROGRAM, "range": [10, 12]},
+            {"id": 3, "source": PROGRAM, "range": [10, 12], "optimize": True},
+        ])
+        self.assertEqual(responses[1]["values"], [5, 3, 3])
+        # Прогретый интерпретатор сбрасывает память между запросами
+        self.assertEqual(responses[2]["values"], [5, 0, 0])
+        self.assertEqual(responses[3]["values"], [5, 0, 0])
+        self.assertEqual((service.hits, service.misses), (1, 2))
+
+    def test_errors_do_not_stop_service(self):
+        service, responses = self.run_requests([
+            "not json",
+            {"id": 1, "source": "LOAD 2 1"},
+            {"id": 2, "source": "LOAD 2 1 5000"},
+            {"id": 3, "source": PROGRAM, "range": [10, 10]},
+        ])
+        self.assertIn("JSONDecodeError", responses[None]["error"])
+        self.assertIn("error", responses[1])
+        self.assertIn("5000", responses[2]["error"])
+        self.assertEqual(responses[3]["values"], [5])
+        # Исходник с ошибкой не остается в кэше
+        self.assertEqual(len(service.programs), 2)
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "нужны Unix-сокеты")
+    def test_unix_socket(self):
+        from service import serve_socket
+
+        async def scenario(path):
+            service = Service(jobs=1, processes=False)
+            service.start()
+            server = asyncio.ensure_future(serve_socket(service, path))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps({"id": 7, "source": PROGRAM, "range": [12, 12]}).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            writer.close()
+            server.cancel()
+            service.close()
+            return response
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            response = asyncio.run(scenario(os.path.join(temp_dir, "uvm.sock")))
+        self.assertEqual(response, {"id": 7, "values": [0], "cached": False})
+
+
+if __name__ == '__main__':
+    unittest.main()
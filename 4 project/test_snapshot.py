@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from assembler import Assembler
+from interpreter import Interpreter
+from snapshot import Checkpointer
+
+SOURCE = "".join(f"LOAD 2 {i * 7 % 50} {i}\nMIN 6 {i} {(i + 3) % 40} {1000 + i}\nREAD 7 1 {i} {1500 + i}\n"
+                 for i in range(40))
+
+
+class Interrupt(Exception):
+    pass
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "state.snap")
+        self.program = Assembler(None, None, None).assemble_source(SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def interpreter(self, **kwargs):
+        interpreter = Interpreter(None, None, None, checkpoint_every=10, **kwargs)
+        interpreter.load_bytes(self.program)
+        return interpreter
+
+    def test_resume_after_interrupt(self):
+        expected = self.interpreter()
+        expected.run()
+
+        # Возобновление с JIT начинается с середины блока: его хвост выполняется обычным циклом
+        for jit in (False, True):
+            interrupted = self.interpreter()
+            checkpointer = Checkpointer(self.path, interrupted)
+            checkpointer.start()
+            save = checkpointer.save
+
+            def save_then_stop():
+                save()
+                if checkpointer.records == 3:
+                    raise Interrupt()
+            checkpointer.save = save_then_stop
+            interrupted.checkpoint = checkpointer
+            with self.assertRaises(Interrupt):
+                interrupted.run()
+
+            # Недописанная запись в конце файла отбрасывается
+            with open(self.path, "ab") as f:
+                f.write(b"\x01\x02\x03")
+
+            resumed = self.interpreter(jit=jit, jit_threshold=0)
+            restorer = Checkpointer(self.path, resumed)
+            restorer.restore()
+            self.assertEqual(restorer.records, 3)
+            self.assertGreater(resumed.pc, 0)
+            resumed.checkpoint = restorer
+            resumed.run()
+            self.assertEqual(resumed.memory, expected.memory)
+            self.assertEqual(restorer.next_offset(), len(self.program))
+
+    def test_snapshot_of_other_program(self):
+        interpreter = self.interpreter()
+        checkpointer = Checkpointer(self.path, interpreter)
+        checkpointer.start()
+        interpreter.checkpoint = checkpointer
+        interpreter.run()
+
+        other = Interpreter(None, None, None)
+        other.load_bytes(Assembler(None, None, None).assemble_source("LOAD 2 1 1"))
+        with self.assertRaises(ValueError):
+            Checkpointer(self.path, other).restore()
+
+
+if __name__ == '__main__':
+    unittest.main()
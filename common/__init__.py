@@ -0,0 +1 @@
+from .telemetry import Metrics, Sink, configure, get_logger, metrics, shutdown
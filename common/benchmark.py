@@ -0,0 +1,82 @@
+"""Общая обвязка бенчмарков: замеры, базовые результаты и код выхода при регрессиях."""
+import gc
+import json
+import math
+import os
+import time
+import tracemalloc
+
+
+def best_times(functions, repeat):
+    """Лучшее время каждой функции из словаря имя -> функция.
+
+    Функции вызываются по кругу, а не каждая repeat раз подряд, поэтому
+    колебания скорости машины одинаково влияют на все замеры и почти не
+    искажают их отношения. Как и timeit, на время замера отключается сборщик
+    мусора: иначе его запуски приходятся на случайные замеры.
+    """
+    best = dict.fromkeys(functions, math.inf)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, function in functions.items():
+                started = time.perf_counter()
+                function()
+                best[name] = min(best[name], time.perf_counter() - started)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def peak_memory(function):
+    """Пик выделенной Python памяти за один вызов, в байтах.
+
+    Под tracemalloc код выполняется в разы медленнее, поэтому память нельзя
+    мерить в тех же прогонах, что и время.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def growth(small, large, ratio):
+    """Показатель степени роста времени: около 1 - линейно, около 2 - квадратично."""
+    if small <= 0 or large <= 0:
+        return 0.0
+    return math.log(large / small) / math.log(ratio)
+
+
+def add_arguments(parser, baseline_path, tolerance, tolerance_help, repeat=3):
+    """Аргументы, общие для всех бенчмарков: повторы и работа с базовыми результатами."""
+    parser.add_argument("--repeat", type=int, default=repeat, help="Количество повторов замера")
+    parser.add_argument("--baseline", default=baseline_path, help="Файл с базовыми результатами")
+    parser.add_argument("--update-baseline", action="store_true", help="Сохранить результаты как базовые")
+    parser.add_argument("--tolerance", type=float, default=tolerance, help=tolerance_help)
+
+
+def check_baseline(args, results, compare):
+    """Сохраняет результаты как базовые или сравнивает с ними; при регрессиях завершается с кодом 1.
+
+    compare(results, baseline) возвращает список описаний регрессий.
+    """
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Базовые результаты сохранены в", args.baseline)
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print("Регрессия:", regression)
+    if regressions:
+        raise SystemExit(1)
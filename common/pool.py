@@ -0,0 +1,64 @@
+"""Пул процессов для пакетных режимов утилит."""
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Сколько тяжелых объектов (например, загруженных программ) держит один процесс-обработчик
+WORKER_CACHE_SIZE = 16
+
+
+class WorkerCache:
+    """Небольшой LRU-кэш процесса-обработчика.
+
+    Вытесненные значения закрываются, если у них есть метод close: иначе
+    кэш удерживал бы их ресурсы (например, отображения файлов) до конца процесса.
+    """
+
+    def __init__(self, size=WORKER_CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, create, reuse=None):
+        """Значение по ключу; при промахе создается вызовом create(), при попадании передается в reuse."""
+        value = self.items.pop(key, None)
+        if value is None:
+            value = create()
+        elif reuse is not None:
+            reuse(value)
+        self.items[key] = value
+        while len(self.items) > self.size:
+            self._close(self.items.popitem(last=False)[1])
+        return value
+
+    def clear(self):
+        while self.items:
+            self._close(self.items.popitem()[1])
+
+    @staticmethod
+    def _close(value):
+        close = getattr(value, "close", None)
+        if close is not None:
+            close()
+
+
+def run_jobs(function, tasks, jobs=None, initializer=None, initargs=()):
+    """Выполняет function над каждой задачей и отдает результаты в порядке задач.
+
+    При jobs == 1 или одной задаче пул не создается: initializer вызывается
+    в текущем процессе, и задачи выполняются в нем же.
+    """
+    if jobs == 1 or len(tasks) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for task in tasks:
+            yield function(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as pool:
+        workers = jobs or os.cpu_count() or 1
+        # Крупные порции снижают накладные расходы на передачу задач между процессами
+        chunksize = max(1, len(tasks) // (workers * 4))
+        yield from pool.map(function, tasks, chunksize=chunksize)
@@ -0,0 +1,284 @@
+"""Общее журналирование и метрики утилит репозитория.
+
+Утилиты пишут сообщения через logging в стиле log.debug("%s", value):
+если уровень выключен, строка не форматируется. Файловые приемники
+(JSON lines, XML, CSV) подключаются через QueueHandler, а пишет в файл
+отдельный поток QueueListener, поэтому горячий цикл не ждет диска.
+Уровень и приемники задаются в configure() или переменными окружения
+HOMEWORKS_LOG_LEVEL, HOMEWORKS_LOG_SINKS (пути через os.pathsep)
+и HOMEWORKS_LOG_SINK_LEVEL.
+"""
+import atexit
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from xml.sax.saxutils import escape, quoteattr
+
+ROOT_LOGGER = "homeworks"
+# Сколько записей накапливается в буфере файла до сброса на диск
+FLUSH_RECORDS = 256
+
+
+def get_logger(name):
+    """Логгер утилиты: все они подчинены общему логгеру homeworks."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def parse_level(level):
+    """Уровень из числа или имени ("debug", "INFO")."""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Неизвестный уровень журналирования: {level}")
+    return value
+
+
+def _entry(record):
+    """Поля записи, общие для всех форматов; fields - из extra={"fields": {...}}."""
+    return {
+        "time": datetime.datetime.fromtimestamp(record.created).isoformat(),
+        "level": record.levelname,
+        "logger": record.name,
+        "message": record.getMessage(),
+        "fields": getattr(record, "fields", None) or {},
+    }
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = _entry(record)
+        fields = entry.pop("fields")
+        entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class XmlFormatter(logging.Formatter):
+    """Элемент <entry> в формате лога эмулятора оболочки, поля - вложенные <field>."""
+
+    def format(self, record):
+        entry = _entry(record)
+        fields = "".join(f"<field name={quoteattr(str(name))}>{escape(str(value))}</field>"
+                         for name, value in entry["fields"].items())
+        return (f"<entry time={quoteattr(entry['time'])} level={quoteattr(entry['level'])} "
+                f"logger={quoteattr(entry['logger'])}>{escape(entry['message'])}{fields}</entry>")
+
+
+class CsvFormatter(logging.Formatter):
+    COLUMNS = ("time", "level", "logger", "message", "fields")
+
+    def format(self, record):
+        entry = _entry(record)
+        entry["fields"] = json.dumps(entry["fields"], ensure_ascii=False, default=str) if entry["fields"] else ""
+        line = io.StringIO()
+        csv.writer(line, lineterminator="").writerow(entry[column] for column in self.COLUMNS)
+        return line.getvalue()
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """Файловый обработчик, сбрасывающий буфер раз в FLUSH_RECORDS записей, а не после каждой."""
+
+    mode = "a"
+    header = None
+    footer = None
+
+    def __init__(self, path):
+        self.pending = 0
+        new = self.mode == "w" or not os.path.exists(path) or os.path.getsize(path) == 0
+        super().__init__(path, self.mode, encoding="utf-8")
+        if new and self.header is not None:
+            self.stream.write(self.header + "\n")
+
+    def flush(self):
+        self.pending += 1
+        if self.pending >= FLUSH_RECORDS:
+            self.pending = 0
+            super().flush()
+
+    def close(self):
+        with self.lock:
+            if self.stream is not None and self.footer is not None:
+                self.stream.write(self.footer + "\n")
+        super().close()
+
+
+class JsonLinesHandler(BufferedFileHandler):
+    def __init__(self, path):
+        super().__init__(path)
+        self.setFormatter(JsonLinesFormatter())
+
+
+class XmlHandler(BufferedFileHandler):
+    """Файл перезаписывается при каждом запуске, чтобы оставаться одним документом <log>."""
+
+    mode = "w"
+    header = "<log>"
+    footer = "</log>"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.setFormatter(XmlFormatter())
+
+
+class CsvHandler(BufferedFileHandler):
+    header = ",".join(CsvFormatter.COLUMNS)
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.setFormatter(CsvFormatter())
+
+
+# Формат приемника по расширению файла
+SINK_HANDLERS = {
+    ".jsonl": JsonLinesHandler,
+    ".xml": XmlHandler,
+    ".csv": CsvHandler,
+}
+
+
+class Sink:
+    """Файловый приемник журнала: записи передаются через очередь и пишутся в фоновом потоке."""
+
+    def __init__(self, path, level=logging.INFO, logger=ROOT_LOGGER):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in SINK_HANDLERS:
+            raise ValueError(f"Неизвестный формат журнала {path}: ожидается {', '.join(SINK_HANDLERS)}")
+        self.path = path
+        self.level = parse_level(level)
+        self.logger = logging.getLogger(logger)
+        self.handler = SINK_HANDLERS[extension](path)
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = QueueHandler(self.queue)
+        self.queue_handler.setLevel(self.level)
+        self.listener = QueueListener(self.queue, self.handler)
+        self.listener.start()
+        self.logger.addHandler(self.queue_handler)
+
+    def close(self):
+        """Дописывает оставшиеся в очереди записи и закрывает файл."""
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.handler.close()
+
+
+class Metrics:
+    """Счетчики и таймеры, в которые пишут утилиты; сводка уходит в журнал через emit()."""
+
+    def __init__(self):
+        self.counters = Counter()
+        # Имя таймера -> [количество замеров, суммарное время в секундах]
+        self.timers = {}
+        self.lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def record_time(self, name, seconds):
+        with self.lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        """Текущие значения: {"counters": {...}, "timers": {имя: {"count", "total"}}}."""
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {name: {"count": count, "total": total} for name, (count, total) in self.timers.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def emit(self, logger=None, level=logging.INFO):
+        """Пишет сводку одной записью с полями; консоль такие записи не показывает."""
+        logger = logger or get_logger("metrics")
+        if not logger.isEnabledFor(level):
+            return
+        snapshot = self.snapshot()
+        if not snapshot["counters"] and not snapshot["timers"]:
+            return
+        fields = dict(snapshot["counters"])
+        for name, timer in snapshot["timers"].items():
+            fields[f"{name}.count"] = timer["count"]
+            fields[f"{name}.seconds"] = round(timer["total"], 6)
+        logger.log(level, "Метрики", extra={"fields": fields})
+
+
+metrics = Metrics()
+
+_state = {"sinks": [], "console": None, "registered": False}
+
+
+def _plain_record(record):
+    """Консоль показывает только сообщения: записи с полями предназначены для файловых приемников."""
+    return not hasattr(record, "fields")
+
+
+def configure(level=None, console=True, sinks=None, sink_level=None):
+    """Настраивает журналирование утилиты, запущенной из командной строки.
+
+    level - уровень консоли (по умолчанию INFO), сообщения в ней выводятся
+    без оформления в stdout, как раньше print. sinks - пути файловых
+    приемников, формат выбирается по расширению.
+    """
+    level = parse_level(level if level is not None else os.environ.get("HOMEWORKS_LOG_LEVEL", logging.INFO))
+    sink_level = parse_level(sink_level if sink_level is not None
+                             else os.environ.get("HOMEWORKS_LOG_SINK_LEVEL", logging.INFO))
+    if sinks is None:
+        sinks = [path for path in os.environ.get("HOMEWORKS_LOG_SINKS", "").split(os.pathsep) if path]
+
+    shutdown()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+    levels = [level] if console else []
+    if console:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.setLevel(level)
+        handler.addFilter(_plain_record)
+        root.addHandler(handler)
+        _state["console"] = handler
+    for path in sinks:
+        _state["sinks"].append(Sink(path, sink_level))
+        levels.append(sink_level)
+    # Уровень логгера отсекает записи до создания LogRecord и форматирования
+    root.setLevel(min(levels) if levels else logging.CRITICAL + 1)
+
+    if not _state["registered"]:
+        atexit.register(shutdown)
+        _state["registered"] = True
+
+
+def shutdown():
+    """Пишет сводку метрик и закрывает приемники, настроенные configure()."""
+    root = logging.getLogger(ROOT_LOGGER)
+    if _state["sinks"]:
+        metrics.emit()
+    for sink in _state["sinks"]:
+        sink.close()
+    _state["sinks"] = []
+    if _state["console"] is not None:
+        root.removeHandler(_state["console"])
+        _state["console"] = None
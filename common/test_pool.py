@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.pool import WorkerCache, run_jobs
+
+
+class Resource:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+class TestWorkerCache(unittest.TestCase):
+    def test_evicts_least_recently_used_and_closes_it(self):
+        cache = WorkerCache(size=2)
+        first = cache.get("a", lambda: Resource("a"), Resource.reset)
+        cache.get("b", lambda: Resource("b"), Resource.reset)
+        self.assertIs(cache.get("a", lambda: Resource("new"), Resource.reset), first)
+        self.assertEqual(first.resets, 1)
+
+        second = cache.items["b"]
+        cache.get("c", lambda: Resource("c"))
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(second.closed)
+        self.assertFalse(first.closed)
+
+        cache.clear()
+        self.assertTrue(first.closed)
+        self.assertEqual(len(cache), 0)
+
+    def test_serial_run_jobs(self):
+        self.assertEqual(list(run_jobs(abs, [-1, 2, -3], jobs=1)), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
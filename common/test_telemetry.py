@@ -0,0 +1,89 @@
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.telemetry import Metrics, Sink, get_logger
+
+
+class Probe:
+    """Считает, сколько раз значение было превращено в строку."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "probe"
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.log = get_logger("test")
+        self.log.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        self.log.setLevel(logging.NOTSET)
+        self.dir.cleanup()
+
+    def write(self, name, level=logging.INFO):
+        path = os.path.join(self.dir.name, name)
+        sink = Sink(path, level, logger=self.log.name)
+        self.log.info("Сборка %s", "завершена")
+        self.log.debug("Пропускается")
+        self.log.info("Метрики", extra={"fields": {"commands": 3}})
+        sink.close()
+        return path
+
+    def test_json_lines_sink(self):
+        with open(self.write("log.jsonl"), encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([entry["message"] for entry in entries], ["Сборка завершена", "Метрики"])
+        self.assertEqual(entries[1]["commands"], 3)
+
+    def test_xml_sink(self):
+        root = ET.parse(self.write("log.xml")).getroot()
+        entries = root.findall("entry")
+        self.assertEqual(entries[0].text, "Сборка завершена")
+        self.assertEqual(entries[1].find("field").attrib["name"], "commands")
+
+    def test_csv_sink(self):
+        with open(self.write("log.csv", logging.DEBUG), newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["message"] for row in rows], ["Сборка завершена", "Пропускается", "Метрики"])
+        self.assertEqual(json.loads(rows[2]["fields"]), {"commands": 3})
+
+    def test_disabled_level_skips_formatting(self):
+        probe = Probe()
+        self.log.setLevel(logging.INFO)
+        self.log.debug("Значение %s", probe)
+        self.assertEqual(probe.calls, 0)
+
+    def test_unknown_sink_format(self):
+        with self.assertRaises(ValueError):
+            Sink(os.path.join(self.dir.name, "log.txt"))
+
+    def test_metrics(self):
+        metrics = Metrics()
+        metrics.count("commands")
+        metrics.count("commands", 4)
+        with metrics.timer("run"):
+            pass
+        with metrics.timer("run"):
+            pass
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"commands": 5})
+        self.assertEqual(snapshot["timers"]["run"]["count"], 2)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "timers": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()